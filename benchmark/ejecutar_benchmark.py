@@ -0,0 +1,150 @@
+"""
+Benchmark sin conexión: ejecuta robot.py (Principal) y bot.py (En Proceso) contra el portal simulado
+con 100, 1.000 y 10.000 filas y reporta filas/s, tiempo total y memoria máxima de cada ejecución.
+
+Cada ejecución corre en un subproceso con su propio directorio temporal (estado SQLite, punto de
+control, perfil de Chrome, métricas y log del bot), con URL_PORTAL y SHEETS_API_ENDPOINT apuntando al
+servidor local, así que no toca el portal real ni la hoja de cálculo real. Requiere Chrome.
+
+Uso:
+    python -m benchmark.ejecutar_benchmark --tamanos 100,1000 --modos url,http --latencia-ms 20
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmark.portal_simulado import PortalSimulado
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+RAIZ_REPOSITORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Script de cada camino de extracción -> hoja donde escribe
+SCRIPTS = {
+    "robot": ("robot.py", "Principal"),
+    "bot": ("bot.py", "En Proceso"),
+}
+
+
+def ejecutar(script, entorno, directorio):
+    """
+    Ejecuta un script del repositorio y mide su duración y memoria máxima (incluye Chrome y chromedriver).
+
+    :param script: Nombre del script en la raíz del repositorio.
+    :param entorno: Variables de entorno del subproceso.
+    :param directorio: Directorio de trabajo del subproceso.
+    :return: Tuple (codigo_salida, segundos, memoria_max_mb).
+    """
+    ruta_salida = os.path.join(directorio, "salida.txt")
+    inicio = time.perf_counter()
+    with open(ruta_salida, "wb") as salida:
+        proceso = subprocess.Popen(
+            [sys.executable, os.path.join(RAIZ_REPOSITORIO, script)],
+            cwd=directorio, env=entorno, stdout=salida, stderr=subprocess.STDOUT
+        )
+        _, estado, uso = os.wait4(proceso.pid, 0)
+    segundos = time.perf_counter() - inicio
+    codigo = os.waitstatus_to_exitcode(estado)
+    if codigo != 0:
+        with open(ruta_salida, encoding="utf-8", errors="replace") as salida:
+            logger.error(f"{script} terminó con código {codigo}: {salida.read()[-2000:]}")
+    # ru_maxrss está en KB en Linux (el mayor de los procesos esperados, no la suma)
+    return codigo, segundos, uso.ru_maxrss / 1024
+
+
+def medir(portal, caso, modo, argumentos):
+    """
+    Ejecuta un caso (robot o bot) en un modo de extracción contra el portal simulado.
+
+    :return: Diccionario con el resultado de la ejecución.
+    """
+    script, hoja = SCRIPTS[caso]
+    portal.hojas.reiniciar()
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as directorio:
+        entorno = dict(
+            os.environ,
+            URL_PORTAL=portal.url,
+            SHEETS_API_ENDPOINT=portal.url + "/",
+            PORTAL_USER="benchmark",
+            PORTAL_PASSWORD="benchmark",
+            MODO_EXTRACCION=modo,
+            NUM_WORKERS=str(argumentos.workers),
+            ESTADO_DB=os.path.join(directorio, "estado.sqlite"),
+            PUNTO_CONTROL=os.path.join(directorio, "punto_control.jsonl"),
+            DIRECTORIO_PERFIL=os.path.join(directorio, "perfil"),
+            METRICAS_JSON=os.path.join(directorio, "metricas.json"),
+            METRICAS_CSV=os.path.join(directorio, "metricas.csv"),
+        )
+        codigo, segundos, memoria_mb = ejecutar(script, entorno, directorio)
+        resumen = {}
+        if os.path.exists(entorno["METRICAS_JSON"]):
+            with open(entorno["METRICAS_JSON"], encoding="utf-8") as archivo:
+                resumen = json.load(archivo)["solicitudes"]
+
+    filas = portal.hojas.contar_solicitudes(hoja)
+    resultado = {
+        "caso": caso,
+        "modo": modo,
+        "filas_portal": portal.datos.filas,
+        "filas_hoja": filas,
+        "codigo_salida": codigo,
+        "segundos": round(segundos, 2),
+        "filas_por_segundo": round(filas / segundos, 2) if segundos else 0.0,
+        "memoria_max_mb": round(memoria_mb, 1),
+        "solicitud_p50": resumen.get("p50"),
+        "solicitud_p95": resumen.get("p95"),
+    }
+    logger.info(
+        f"{caso}/{modo} con {portal.datos.filas} filas: {filas} en la hoja en {segundos:.1f}s "
+        f"({resultado['filas_por_segundo']} filas/s), memoria máx. {memoria_mb:.0f} MB."
+    )
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sin conexión de robot.py y bot.py.")
+    parser.add_argument("--tamanos", default="100,1000,10000", help="Filas por tabla, separadas por coma.")
+    parser.add_argument("--casos", default="robot,bot", help="Scripts a medir: robot, bot.")
+    parser.add_argument("--modos", default="url", help="Valores de MODO_EXTRACCION a medir (clic, url, http, cdp).")
+    parser.add_argument("--workers", type=int, default=1, help="NUM_WORKERS para el modo url.")
+    parser.add_argument("--latencia-ms", type=int, default=20, help="Latencia del portal simulado por respuesta.")
+    parser.add_argument("--retardo-ms", type=int, default=50, help="Duración de redibujos y colapsos simulados.")
+    parser.add_argument("--salida", default="benchmark_resultados.json", help="Archivo JSON con los resultados.")
+    argumentos = parser.parse_args(argv)
+
+    casos = [caso.strip() for caso in argumentos.casos.split(",") if caso.strip()]
+    desconocidos = [caso for caso in casos if caso not in SCRIPTS]
+    if desconocidos:
+        parser.error(f"casos desconocidos: {', '.join(desconocidos)}")
+
+    resultados = []
+    for tamano in (int(valor) for valor in argumentos.tamanos.split(",")):
+        portal = PortalSimulado(tamano, argumentos.latencia_ms, argumentos.retardo_ms).iniciar()
+        logger.info(f"Portal simulado con {tamano} filas por tabla en {portal.url}.")
+        try:
+            for modo in (modo.strip() for modo in argumentos.modos.split(",") if modo.strip()):
+                for caso in casos:
+                    resultados.append(medir(portal, caso, modo, argumentos))
+        finally:
+            portal.detener()
+
+    with open(argumentos.salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+
+    print(f"{'caso':<6} {'modo':<5} {'filas':>6} {'en hoja':>8} {'seg':>8} {'filas/s':>8} {'MB':>7}")
+    for r in resultados:
+        print(
+            f"{r['caso']:<6} {r['modo']:<5} {r['filas_portal']:>6} {r['filas_hoja']:>8} "
+            f"{r['segundos']:>8} {r['filas_por_segundo']:>8} {r['memoria_max_mb']:>7}"
+        )
+    logger.info(f"Resultados guardados en '{argumentos.salida}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,498 @@
+"""
+Portal de requerimientos simulado para medir el scraper sin tocar sistemaderequerimientos.cl.
+
+Sirve un login, el menú, el listado con dos tablas paginadas al estilo DataTables (con un pequeño
+reemplazo de jQuery/DataTables incluido en la página) y el detalle de cada solicitud con las mismas
+secciones data-metakey. También expone una API de Google Sheets falsa en memoria (values.get,
+batchGet, batchUpdate y clear) para usar con SHEETS_API_ENDPOINT.
+
+Uso independiente:
+    python -m benchmark.portal_simulado --filas 1000 --latencia-ms 50 --puerto 8765
+"""
+import argparse
+import html
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+TABLAS = {
+    "table-dt_review": {"pestana": "tabs-icons-text-1-tab", "panel": "panel-review", "base": 100000},
+    "table-dt_process": {"pestana": "tabs-icons-text-2-tab", "panel": "panel-process", "base": 200000},
+}
+
+CSS = """
+.collapse:not(.show) { display: none; }
+.oculto { display: none; }
+"""
+
+PAGINA_LOGIN = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Portal simulado</title><style>{css}</style></head>
+<body>
+<ul class="nav nav-tabs">
+  <li><a id="tabs-icons-text-1-tab" href="#">Soy Cliente</a></li>
+  <li><a id="tabs-icons-text-2-tab" href="#"
+         onclick="document.getElementById('tabs-icons-text-2').classList.remove('oculto'); return false;">Soy Proveedor</a></li>
+</ul>
+<div id="tabs-icons-text-2" class="oculto">
+  <form method="post" action="/login">
+    <input id="inputUsername_recover" name="usuario" type="text">
+    <input id="inputPassword_recover" name="clave" type="password">
+    <button type="submit">Iniciar Sesión</button>
+  </form>
+</div>
+</body></html>
+"""
+
+PAGINA_INICIO = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Inicio</title><style>{css}</style></head>
+<body>
+<nav>
+  <a class="nav-link dropdown-toggle" href="#"
+     onclick="document.getElementById('menu-soporte').classList.remove('oculto'); return false;">Soporte operativo</a>
+  <div id="menu-soporte" class="oculto">
+    <a href="#module_hrm" onclick="document.getElementById('module_hrm').classList.remove('oculto'); return false;">
+      <span>Personal Externo</span></a>
+    <div id="module_hrm" class="oculto">
+      <a href="/workflow/externalizacion-personal">Estado de solicitudes Personal Externo</a>
+    </div>
+  </div>
+</nav>
+</body></html>
+"""
+
+# Reemplazo mínimo de jQuery/DataTables: pagina en el cliente, redibuja con un retardo configurable
+# (mostrando .dataTables_processing y jQuery.active) y expone la API que usa listado.py
+JS_DATATABLES_SIMULADO = """
+(function () {
+    var TAMANO = 10, RETARDO = %(retardo)d;
+    var tablas = {};
+    window.jQuery = function (selector) {
+        var tabla = tablas[String(selector).replace('#', '')];
+        return {DataTable: function () { return tabla.api; }};
+    };
+    jQuery.active = 0;
+    jQuery.fn = {dataTable: {isDataTable: function (s) { return !!tablas[String(s).replace('#', '')]; }}};
+
+    function Tabla(elemento, visible) {
+        var self = this;
+        self.id = elemento.id;
+        self.tbody = elemento.tBodies[0];
+        self.filas = Array.prototype.slice.call(self.tbody.rows);
+        self.pagina = 0;
+        self.paginas = Math.max(1, Math.ceil(self.filas.length / TAMANO));
+        self.visible = visible;
+        self.procesando = document.createElement('div');
+        self.procesando.className = 'dataTables_processing';
+        self.procesando.style.display = 'none';
+        elemento.parentNode.insertBefore(self.procesando, elemento);
+        self.paginador = document.createElement('ul');
+        self.paginador.className = 'pagination';
+        elemento.parentNode.appendChild(self.paginador);
+        self.api = {
+            settings: function () { return [{oFeatures: {bServerSide: false}, ajax: null}]; },
+            ajax: {url: function () { return null; }},
+            page: {info: function () { return {recordsTotal: self.filas.length}; }},
+            rows: function () {
+                return {
+                    nodes: function () { return {toArray: function () { return self.filas.slice(); }}; },
+                    data: function () {
+                        return {toArray: function () {
+                            return self.filas.map(function (tr) {
+                                return Array.prototype.map.call(tr.cells, function (td) { return td.innerHTML; });
+                            });
+                        }};
+                    }
+                };
+            }
+        };
+    }
+    Tabla.prototype.dibujar = function () {
+        var self = this;
+        while (self.tbody.firstChild) { self.tbody.removeChild(self.tbody.firstChild); }
+        self.paginador.innerHTML = '';
+        if (!self.visible) { return; }
+        self.filas.slice(self.pagina * TAMANO, (self.pagina + 1) * TAMANO).forEach(function (tr) {
+            self.tbody.appendChild(tr);
+        });
+        var ultima = self.pagina >= self.paginas - 1;
+        self.paginador.innerHTML =
+            '<li class="paginate_button page-item previous' + (self.pagina === 0 ? ' disabled' : '') + '" id="' + self.id + '_previous"><a href="#">Anterior</a></li>' +
+            '<li class="paginate_button page-item active"><a href="#">' + (self.pagina + 1) + '</a></li>' +
+            '<li class="paginate_button page-item next' + (ultima ? ' disabled' : '') + '" id="' + self.id + '_next"><a href="#">Siguiente</a></li>';
+        document.getElementById(self.id + '_next').onclick = function () {
+            if (self.pagina < self.paginas - 1) { self.ir(self.pagina + 1); }
+            return false;
+        };
+    };
+    Tabla.prototype.ir = function (pagina) {
+        var self = this;
+        self.procesando.style.display = 'block';
+        jQuery.active += 1;
+        setTimeout(function () {
+            self.pagina = pagina;
+            self.dibujar();
+            self.procesando.style.display = 'none';
+            jQuery.active -= 1;
+        }, RETARDO);
+    };
+
+    document.querySelectorAll('table.datatable').forEach(function (elemento, indice) {
+        tablas[elemento.id] = new Tabla(elemento, indice === 0);
+        tablas[elemento.id].dibujar();
+    });
+    document.querySelectorAll('a[data-panel]').forEach(function (pestana) {
+        pestana.onclick = function () {
+            document.querySelectorAll('a[data-panel]').forEach(function (otra) {
+                var activa = otra === pestana;
+                document.getElementById(otra.getAttribute('data-panel')).classList.toggle('oculto', !activa);
+                var tabla = tablas[otra.getAttribute('data-tabla')];
+                tabla.visible = activa;
+                tabla.dibujar();
+            });
+            return false;
+        };
+    });
+})();
+"""
+
+JS_DETALLE_SIMULADO = """
+function abrirColapso(cabecera, id) {
+    var colapso = document.getElementById(id);
+    colapso.classList.add('collapsing');
+    setTimeout(function () {
+        colapso.classList.remove('collapsing');
+        colapso.classList.add('show');
+        cabecera.setAttribute('aria-expanded', 'true');
+    }, %(retardo)d);
+}
+"""
+
+CARGOS = ["Operario de bodega", "Reponedor", "Cajero", "Guardia", "Auxiliar de aseo", "Conductor"]
+SUCURSALES = ["Santiago Centro", "Maipú", "Puente Alto", "Viña del Mar", "Concepción", "Antofagasta"]
+CAUSALES = ["Aumento de demanda", "Reemplazo por licencia", "Vacaciones", "Proyecto temporal"]
+
+
+class DatosSimulados:
+    """
+    Genera de forma determinista las solicitudes de cada tabla y el detalle de cada una.
+    """
+
+    def __init__(self, filas, semilla=1):
+        self.filas = filas
+        self.semilla = semilla
+
+    def numeros(self, tabla_id):
+        base = TABLAS[tabla_id]["base"]
+        return [str(base + indice) for indice in range(self.filas)]
+
+    def detalle(self, numero):
+        azar = random.Random(f"{self.semilla}-{numero}")
+        proveedores = azar.randint(1, 3) if azar.random() < 0.5 else 0
+        return {
+            "campos": {
+                "Cargo solicitado:": azar.choice(CARGOS),
+                "Dirección confirmada:": azar.choice(SUCURSALES),
+                "Fecha de inicio:": f"2026-{azar.randint(1, 12):02d}-{azar.randint(1, 28):02d}",
+                "Fecha de término:": f"2027-{azar.randint(1, 12):02d}-{azar.randint(1, 28):02d}",
+                "Causal solicitud:": azar.choice(CAUSALES),
+                "Observaciones:": f"Solicitud simulada {numero}",
+            },
+            "metakeys": ["datos_solicitud"] + [
+                metakey for metakey in
+                ("aceptacion_evaluador_rrhh", "proveedor_seleccionado", "cierre_automatico", "rechazo_proveedor", "anulacion_ot")
+                if azar.random() < 0.3
+            ] + (["confirmacion_personal_a_enviar"] if proveedores else []),
+            "boton_aceptar": azar.random() < 0.3,
+            "proveedores": [
+                [f"Proveedor {azar.randint(1, 20)}", f"Trabajador {azar.randint(1, 999)}", f"{azar.randint(10, 25)}.{azar.randint(100, 999)}.{azar.randint(100, 999)}-{azar.randint(0, 9)}",
+                 "Confirmado", f"2026-{azar.randint(1, 12):02d}-{azar.randint(1, 28):02d}", azar.choice(["Sí", "No"])]
+                for _ in range(proveedores)
+            ],
+        }
+
+
+def pagina_listado(datos, retardo_ms):
+    partes = [
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Estado de solicitudes</title><style>{CSS}</style></head><body>',
+        '<ul class="nav nav-tabs">'
+    ]
+    for tabla_id, tabla in TABLAS.items():
+        partes.append(
+            f'<li><a id="{tabla["pestana"]}" href="#" data-panel="{tabla["panel"]}" data-tabla="{tabla_id}">{tabla_id}</a></li>'
+        )
+    partes.append("</ul>")
+    for indice, (tabla_id, tabla) in enumerate(TABLAS.items()):
+        partes.append(f'<div id="{tabla["panel"]}" class="{"" if indice == 0 else "oculto"}">')
+        partes.append(
+            f'<table id="{tabla_id}" class="datatable"><thead><tr><th>N°</th><th>Cargo</th><th>Sucursal</th>'
+            '<th>Estado</th></tr></thead><tbody>'
+        )
+        for numero in datos.numeros(tabla_id):
+            detalle = datos.detalle(numero)
+            partes.append(
+                f'<tr><td class="sorting_1"><a class="btn btn-sm text-orange" target="_blank" '
+                f'href="/pe_workflow/externalizacion-personal/{numero}">{numero}</a></td>'
+                f'<td>{html.escape(detalle["campos"]["Cargo solicitado:"])}</td>'
+                f'<td>{html.escape(detalle["campos"]["Dirección confirmada:"])}</td>'
+                f'<td>{"Con proveedor" if detalle["proveedores"] else "Pendiente"}</td></tr>'
+            )
+        partes.append("</tbody></table></div>")
+    partes.append(f"<script>{JS_DATATABLES_SIMULADO % {'retardo': retardo_ms}}</script></body></html>")
+    return "".join(partes)
+
+
+def pagina_detalle(numero, detalle, retardo_ms):
+    campos = "".join(
+        f"<p><strong>{html.escape(etiqueta)}</strong> <span>{html.escape(valor)}</span></p>"
+        for etiqueta, valor in detalle["campos"].items()
+    )
+    secciones = [
+        '<div class="card" data-metakey="datos_solicitud">'
+        '<div role="button" class="card-header collapseHeader" aria-expanded="false" '
+        'onclick="abrirColapso(this, \'collapse_datos_solicitud\')">Datos de la solicitud</div>'
+        f'<div id="collapse_datos_solicitud" class="collapse"><div class="card-body">{campos}</div></div></div>'
+    ]
+    for metakey in detalle["metakeys"][1:]:
+        contenido = ""
+        if metakey == "confirmacion_personal_a_enviar":
+            filas = "".join(
+                "<tr>" + "".join(f"<td>{html.escape(celda)}</td>" for celda in fila) + "</tr>"
+                for fila in detalle["proveedores"]
+            )
+            contenido = (
+                '<div class="list-group-item text-sm"><table class="table table-bordered">'
+                "<thead><tr><th>Proveedor</th><th>Trabajador</th><th>RUT</th><th>Estado</th><th>Fecha</th>"
+                f"<th>Asistencia</th></tr></thead><tbody>{filas}</tbody></table></div>"
+            )
+        secciones.append(f'<div class="card" data-metakey="{metakey}"><div class="card-header">{metakey}</div>{contenido}</div>')
+    if detalle["boton_aceptar"]:
+        secciones.append(
+            '<button class="btn btn-outline-success" data-target="#form-modal-aceptarSolicitudYOT-aceptacion_ot">Aceptar</button>'
+        )
+    return (
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Solicitud {numero}</title><style>{CSS}</style>'
+        f"<script>{JS_DETALLE_SIMULADO % {'retardo': retardo_ms}}</script></head>"
+        f'<body><h1>Solicitud {numero}</h1>{"".join(secciones)}</body></html>'
+    )
+
+
+class HojasSimuladas:
+    """
+    Almacén en memoria que imita los valores de una hoja de cálculo de Google Sheets.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hojas = {}
+
+    @staticmethod
+    def _indice(columna):
+        indice = 0
+        for letra in columna.upper():
+            indice = indice * 26 + (ord(letra) - ord("A") + 1)
+        return indice - 1
+
+    def _parsear(self, rango):
+        hoja, celdas = rango.rsplit("!", 1)
+        coincidencia = re.fullmatch(r"([A-Za-z]+)(\d*)(?::([A-Za-z]+)(\d*))?", celdas)
+        columna_inicial, fila_inicial, columna_final, fila_final = coincidencia.groups()
+        return (
+            hoja.strip("'"),
+            int(fila_inicial or 1) - 1,
+            self._indice(columna_inicial),
+            int(fila_final) if fila_final else None,
+            self._indice(columna_final) + 1 if columna_final else None,
+        )
+
+    def leer(self, rango):
+        hoja, fila_inicial, columna_inicial, fila_final, columna_final = self._parsear(rango)
+        with self._lock:
+            filas = self.hojas.get(hoja, [])[fila_inicial:fila_final]
+            valores = [list(fila[columna_inicial:columna_final]) for fila in filas]
+        # Como la API real: sin celdas ni filas vacías al final
+        for fila in valores:
+            while fila and fila[-1] == "":
+                fila.pop()
+        while valores and not valores[-1]:
+            valores.pop()
+        return valores
+
+    def escribir(self, rango, valores):
+        hoja, fila_inicial, columna_inicial, _, _ = self._parsear(rango)
+        with self._lock:
+            filas = self.hojas.setdefault(hoja, [])
+            for desplazamiento, fila in enumerate(valores):
+                indice = fila_inicial + desplazamiento
+                while len(filas) <= indice:
+                    filas.append([])
+                actual = filas[indice]
+                fin = columna_inicial + len(fila)
+                if len(actual) < fin:
+                    actual.extend([""] * (fin - len(actual)))
+                actual[columna_inicial:fin] = ["" if valor is None else str(valor) for valor in fila]
+        return len(valores)
+
+    def limpiar(self, rango):
+        hoja, fila_inicial, columna_inicial, fila_final, columna_final = self._parsear(rango)
+        with self._lock:
+            for fila in self.hojas.get(hoja, [])[fila_inicial:fila_final]:
+                fin = len(fila) if columna_final is None else min(columna_final, len(fila))
+                fila[columna_inicial:fin] = [""] * max(0, fin - columna_inicial)
+
+    def contar_solicitudes(self, hoja, fila_inicial=3):
+        """
+        Devuelve cuántas solicitudes distintas (primera columna) hay en la hoja desde fila_inicial.
+        """
+        with self._lock:
+            return len({fila[0] for fila in self.hojas.get(hoja, [])[fila_inicial - 1:] if fila and fila[0]})
+
+    def reiniciar(self):
+        with self._lock:
+            self.hojas.clear()
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    portal = None
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, estado, cuerpo, tipo="text/html; charset=utf-8", cabeceras=None):
+        datos = cuerpo.encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(datos)))
+        for nombre, valor in (cabeceras or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _json(self, objeto, estado=200):
+        self._responder(estado, json.dumps(objeto, ensure_ascii=False), "application/json; charset=utf-8")
+
+    def _autenticado(self):
+        cookies = self.headers.get("Cookie", "")
+        return any(parte.strip() == f"sesion={token}" for parte in cookies.split(";") for token in self.portal.sesiones)
+
+    def _cuerpo(self):
+        largo = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(largo).decode("utf-8") if largo else ""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.startswith("/v4/spreadsheets/"):
+            return self._sheets("GET", url)
+
+        time.sleep(self.portal.latencia_ms / 1000)
+        if not self._autenticado() or url.path == "/":
+            if self._autenticado():
+                return self._responder(302, "", cabeceras={"Location": "/inicio"})
+            return self._responder(200, PAGINA_LOGIN.format(css=CSS))
+        if url.path == "/inicio":
+            return self._responder(200, PAGINA_INICIO.format(css=CSS))
+        if url.path == "/workflow/externalizacion-personal":
+            return self._responder(200, self.portal.listado)
+        coincidencia = re.fullmatch(r"/pe_workflow/externalizacion-personal/(\d+)", url.path)
+        if coincidencia:
+            numero = coincidencia.group(1)
+            return self._responder(200, pagina_detalle(numero, self.portal.datos.detalle(numero), self.portal.retardo_ms))
+        self._responder(404, "No encontrado")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.startswith("/v4/spreadsheets/"):
+            return self._sheets("POST", url)
+        time.sleep(self.portal.latencia_ms / 1000)
+        if url.path == "/login":
+            self._cuerpo()
+            token = uuid.uuid4().hex
+            self.portal.sesiones.add(token)
+            return self._responder(302, "", cabeceras={"Location": "/inicio", "Set-Cookie": f"sesion={token}; Path=/"})
+        self._responder(404, "No encontrado")
+
+    def _sheets(self, metodo, url):
+        hojas = self.portal.hojas
+        ruta = unquote(url.path)
+        parametros = parse_qs(url.query)
+        if metodo == "GET" and ruta.endswith("/values:batchGet"):
+            return self._json({"valueRanges": [
+                {"range": rango, "majorDimension": "ROWS", "values": hojas.leer(rango)}
+                for rango in parametros.get("ranges", [])
+            ]})
+        if metodo == "POST" and ruta.endswith("/values:batchUpdate"):
+            cuerpo = json.loads(self._cuerpo() or "{}")
+            filas = sum(hojas.escribir(dato["range"], dato.get("values", [])) for dato in cuerpo.get("data", []))
+            return self._json({"totalUpdatedRows": filas, "responses": []})
+        if metodo == "POST" and ruta.endswith(":clear"):
+            self._cuerpo()
+            hojas.limpiar(ruta.rsplit("/values/", 1)[1][:-len(":clear")])
+            return self._json({})
+        if metodo == "GET" and "/values/" in ruta:
+            rango = ruta.rsplit("/values/", 1)[1]
+            return self._json({"range": rango, "majorDimension": "ROWS", "values": hojas.leer(rango)})
+        self._json({"error": {"code": 404, "message": f"No soportado: {metodo} {ruta}"}}, 404)
+
+
+class PortalSimulado:
+    """
+    Servidor HTTP local con el portal simulado y la API de Sheets falsa.
+    """
+
+    def __init__(self, filas=100, latencia_ms=0, retardo_ms=50, puerto=0, semilla=1):
+        """
+        :param filas: Solicitudes por tabla del listado.
+        :param latencia_ms: Latencia agregada a cada respuesta del portal.
+        :param retardo_ms: Duración de los redibujos de DataTables y de la apertura de colapsos.
+        :param puerto: Puerto de escucha (0 = uno libre).
+        :param semilla: Semilla de los datos generados.
+        """
+        self.datos = DatosSimulados(filas, semilla)
+        self.latencia_ms = latencia_ms
+        self.retardo_ms = retardo_ms
+        self.hojas = HojasSimuladas()
+        self.sesiones = set()
+        self.listado = pagina_listado(self.datos, retardo_ms)
+        manejador = type("Manejador", (_Manejador,), {"portal": self})
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+        self._servidor.daemon_threads = True
+        self._hilo = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._servidor.server_address[1]}"
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, name="portal-simulado", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portal de requerimientos simulado.")
+    parser.add_argument("--filas", type=int, default=100, help="Solicitudes por tabla.")
+    parser.add_argument("--latencia-ms", type=int, default=0, help="Latencia agregada a cada respuesta.")
+    parser.add_argument("--retardo-ms", type=int, default=50, help="Duración de redibujos y colapsos.")
+    parser.add_argument("--puerto", type=int, default=8765)
+    argumentos = parser.parse_args()
+
+    portal = PortalSimulado(argumentos.filas, argumentos.latencia_ms, argumentos.retardo_ms, argumentos.puerto).iniciar()
+    print(f"Portal simulado en {portal.url} (URL_PORTAL={portal.url}, SHEETS_API_ENDPOINT={portal.url}/)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        portal.detener()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from eventos import eventos
+
+logger = logging.getLogger(__name__)
+
+# Horas que se reutiliza el detalle guardado según las secciones de la solicitud, "seccion=horas"
+# separados por coma; 'otras' aplica a las que no tienen ninguna de las secciones indicadas (0 = no se guardan).
+# Las solicitudes con cierre automático o reasignadas ya no cambian, así que se guardan por más tiempo.
+CACHE_TTL_HORAS = os.getenv("CACHE_TTL_HORAS", "cierre_automatico=720,reasignacion_solicitudes=720,otras=0")
+# Tamaño máximo del caché; al superarlo se eliminan las solicitudes usadas hace más tiempo
+CACHE_MAX_MB = float(os.getenv("CACHE_MAX_MB", "50"))
+
+
+def _leer_ttl(texto):
+    ttl = {}
+    for par in texto.split(","):
+        if "=" in par:
+            seccion, horas = par.split("=", 1)
+            ttl[seccion.strip()] = float(horas) * 3600
+    return ttl
+
+
+class CacheDetalle:
+    """
+    Caché local (SQLite) del detalle extraído de cada solicitud (datos, secciones y tabla del proveedor),
+    para no volver a abrir solicitudes cuyo detalle ya no cambia.
+
+    Cada solicitud se guarda con un vencimiento que depende de sus secciones (ver CACHE_TTL_HORAS) y
+    la huella de su contenido; si se vuelve a extraer sin cambios solo se renueva el vencimiento.
+    Al superar max_mb se eliminan las solicitudes usadas hace más tiempo (LRU).
+    Mientras el caché no está abierto, consultar() no devuelve nada y guardar() no hace nada.
+    Es seguro usarlo desde varios hilos.
+    """
+
+    def __init__(self, ttl=CACHE_TTL_HORAS, max_mb=CACHE_MAX_MB):
+        self.ttl = _leer_ttl(ttl)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._conexion = None
+        self._bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def abrir(self, ruta):
+        """
+        Abre (o crea) el archivo del caché y elimina las solicitudes vencidas.
+
+        :param ruta: Ruta del archivo SQLite.
+        """
+        try:
+            with self._lock:
+                self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+                self._conexion.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS detalle (
+                        numero_solicitud TEXT PRIMARY KEY,
+                        huella TEXT NOT NULL,
+                        contenido TEXT NOT NULL,
+                        bytes INTEGER NOT NULL,
+                        vence REAL NOT NULL,
+                        usado REAL NOT NULL
+                    )
+                    """
+                )
+                self._conexion.execute("DELETE FROM detalle WHERE vence < ?", (time.time(),))
+                self._conexion.commit()
+                self._bytes = self._conexion.execute("SELECT COALESCE(SUM(bytes), 0) FROM detalle").fetchone()[0]
+            logger.info(f"Caché de detalle abierto: {ruta} ({self._bytes / (1024 * 1024):.1f} MB).")
+        except Exception as e:
+            logger.error(f"No se pudo abrir el caché de detalle '{ruta}': {e}")
+            self._conexion = None
+
+    def _vencimiento(self, secciones):
+        # Se usa el mayor TTL entre las secciones presentes; sin ninguna, el de 'otras'
+        segundos = [self.ttl[seccion] for seccion, presente in secciones.items() if presente and seccion in self.ttl]
+        return max(segundos) if segundos else self.ttl.get("otras", 0)
+
+    def consultar(self, numeros_solicitud, claves_por_numero=None):
+        """
+        Devuelve el detalle guardado y vigente de las solicitudes indicadas.
+
+        :param numeros_solicitud: Números de solicitud a buscar.
+        :param claves_por_numero: Diccionario número -> claves adicionales que deben estar en los datos
+                                  (por ejemplo 'tabla_aceptacion_proveedor'); si faltan, no hay acierto.
+        :return: Diccionario número -> (datos, secciones) con los aciertos.
+        """
+        if self._conexion is None or not numeros_solicitud:
+            return {}
+        numeros = list(numeros_solicitud)
+        ahora = time.time()
+        encontrados = {}
+        with self._lock:
+            for inicio in range(0, len(numeros), 500):
+                tanda = numeros[inicio:inicio + 500]
+                cursor = self._conexion.execute(
+                    f"SELECT numero_solicitud, contenido FROM detalle "
+                    f"WHERE vence >= ? AND numero_solicitud IN ({','.join('?' * len(tanda))})",
+                    (ahora, *tanda)
+                )
+                for numero, contenido in cursor.fetchall():
+                    datos, secciones = json.loads(contenido)
+                    if all(clave in datos for clave in (claves_por_numero or {}).get(numero) or ()):
+                        encontrados[numero] = (datos, secciones)
+            if encontrados:
+                self._conexion.executemany(
+                    "UPDATE detalle SET usado = ? WHERE numero_solicitud = ?",
+                    [(ahora, numero) for numero in encontrados]
+                )
+                self._conexion.commit()
+            self.aciertos += len(encontrados)
+            self.fallos += len(numeros) - len(encontrados)
+
+        if encontrados:
+            logger.info(f"Caché de detalle: {len(encontrados)} de {len(numeros)} solicitudes sin volver a abrir.")
+            eventos.emitir("cache_detalle", aciertos=len(encontrados), consultadas=len(numeros))
+        return encontrados
+
+    def guardar(self, datos, secciones):
+        """
+        Guarda el detalle recién extraído de una solicitud si sus secciones tienen TTL.
+
+        :param datos: Diccionario con los datos extraídos (incluye numero_solicitud).
+        :param secciones: Diccionario clave -> bool con las secciones presentes.
+        """
+        if self._conexion is None or not datos or not secciones:
+            return
+        ttl = self._vencimiento(secciones)
+        if ttl <= 0:
+            return
+        numero = str(datos["numero_solicitud"])
+        contenido = json.dumps([datos, secciones], ensure_ascii=False, separators=(",", ":"))
+        huella = hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+        ahora = time.time()
+        try:
+            with self._lock:
+                anterior = self._conexion.execute(
+                    "SELECT huella, bytes FROM detalle WHERE numero_solicitud = ?", (numero,)
+                ).fetchone()
+                if anterior is not None and anterior[0] == huella:
+                    # Mismo contenido: solo se renueva el vencimiento
+                    self._conexion.execute(
+                        "UPDATE detalle SET vence = ?, usado = ? WHERE numero_solicitud = ?", (ahora + ttl, ahora, numero)
+                    )
+                else:
+                    tamano = len(contenido.encode("utf-8"))
+                    self._conexion.execute(
+                        "INSERT OR REPLACE INTO detalle (numero_solicitud, huella, contenido, bytes, vence, usado) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (numero, huella, contenido, tamano, ahora + ttl, ahora)
+                    )
+                    self._bytes += tamano - (anterior[1] if anterior is not None else 0)
+                    if self._bytes > self.max_bytes:
+                        self._liberar()
+                self._conexion.commit()
+        except Exception as e:
+            logger.error(f"Error guardando la solicitud {numero} en el caché de detalle: {e}")
+
+    def _liberar(self):
+        # Elimina las solicitudes usadas hace más tiempo hasta quedar en el 90% del tamaño máximo
+        objetivo = self.max_bytes * 0.9
+        eliminadas = []
+        for numero, tamano in self._conexion.execute("SELECT numero_solicitud, bytes FROM detalle ORDER BY usado"):
+            if self._bytes <= objetivo:
+                break
+            eliminadas.append((numero,))
+            self._bytes -= tamano
+        self._conexion.executemany("DELETE FROM detalle WHERE numero_solicitud = ?", eliminadas)
+        logger.info(f"Caché de detalle: se eliminaron {len(eliminadas)} solicitudes usadas hace más tiempo.")
+
+    def cerrar(self):
+        """
+        Cierra el archivo del caché y registra los aciertos de la ejecución.
+        """
+        with self._lock:
+            if self._conexion is None:
+                return
+            self._conexion.close()
+            self._conexion = None
+        logger.info(f"Caché de detalle: {self.aciertos} aciertos y {self.fallos} fallos en la ejecución.")
+
+
+cache_detalle = CacheDetalle()
@@ -0,0 +1,150 @@
+import base64
+import gzip
+import logging
+import os
+import queue
+import re
+import threading
+
+from eventos import eventos
+
+logger = logging.getLogger(__name__)
+
+# Carpeta donde se guardan las capturas de fallos (se sube como artefacto del workflow)
+CAPTURAS_DIR = os.getenv("CAPTURAS_DIR", "capturas")
+# Máximo de capturas y tamaño total (en MB) por ejecución; al superarlos se dejan de guardar
+CAPTURAS_MAX = int(os.getenv("CAPTURAS_MAX", "25"))
+CAPTURAS_MAX_MB = float(os.getenv("CAPTURAS_MAX_MB", "50"))
+# Capturas que pueden esperar en memoria a ser escritas; si la cola está llena se descartan
+CAPTURAS_PENDIENTES = int(os.getenv("CAPTURAS_PENDIENTES", "10"))
+
+
+class CapturasFallo:
+    """
+    Guarda la captura de pantalla (PNG) y el HTML (comprimido con gzip) de la página cuando falla
+    una solicitud.
+
+    El hilo que extrae solo pide los datos al navegador; decodificar, comprimir y escribir en disco
+    se hace en un hilo en segundo plano. Se guardan como máximo max_capturas capturas y max_mb MB
+    por ejecución. Es seguro usarlo desde varios hilos.
+    """
+
+    def __init__(self, directorio=CAPTURAS_DIR, max_capturas=CAPTURAS_MAX, max_mb=CAPTURAS_MAX_MB,
+                 max_pendientes=CAPTURAS_PENDIENTES):
+        self.directorio = directorio
+        self.max_capturas = max_capturas
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._cola = queue.Queue(maxsize=max_pendientes)
+        self._hilo = None
+        self.capturas = 0
+        self.guardadas = 0
+        self.bytes = 0
+        self.descartadas = 0
+
+    def capturar(self, driver, nombre_archivo):
+        """
+        Pide al navegador la captura de pantalla y el HTML de la página actual y los encola para
+        escribirlos en segundo plano.
+
+        :param driver: Instancia de Selenium WebDriver (en la pestaña que falló).
+        :param nombre_archivo: Nombre base de la captura (por ejemplo 'error_extraccion_123.png').
+        :return: True si la captura se encoló, False si se descartó por los límites o por un error.
+        """
+        with self._lock:
+            if self.capturas >= self.max_capturas or self.bytes >= self.max_bytes:
+                self._descartar(nombre_archivo, "se alcanzó el límite de capturas de la ejecución")
+                return False
+            self.capturas += 1
+            numero = self.capturas
+
+        try:
+            png = driver.get_screenshot_as_base64()
+        except Exception as e:
+            logger.warning(f"No se pudo obtener la captura de pantalla para {nombre_archivo}: {e}")
+            png = None
+        try:
+            html = driver.page_source
+        except Exception as e:
+            logger.warning(f"No se pudo obtener el HTML de la página para {nombre_archivo}: {e}")
+            html = None
+        if png is None and html is None:
+            return False
+
+        nombre = re.sub(r"[^\w.-]+", "_", os.path.splitext(nombre_archivo)[0])
+        base = f"{numero:03d}_{nombre}"
+        try:
+            self._iniciar()
+            self._cola.put_nowait((base, png, html))
+        except queue.Full:
+            with self._lock:
+                self._descartar(nombre_archivo, "hay demasiadas capturas pendientes de escribir")
+            return False
+        return True
+
+    def _descartar(self, nombre_archivo, motivo):
+        # Solo se avisa la primera vez para no llenar el log
+        if self.descartadas == 0:
+            logger.warning(f"Captura {nombre_archivo} descartada: {motivo}.")
+        self.descartadas += 1
+
+    def _iniciar(self):
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                os.makedirs(self.directorio, exist_ok=True)
+                self._hilo = threading.Thread(target=self._escribir_pendientes, name="capturas", daemon=True)
+                self._hilo.start()
+
+    def _escribir_pendientes(self):
+        while True:
+            pendiente = self._cola.get()
+            try:
+                if pendiente is None:
+                    return
+                self._escribir(*pendiente)
+            finally:
+                self._cola.task_done()
+
+    def _escribir(self, base, png, html):
+        archivos = []
+        if png is not None:
+            archivos.append((f"{base}.png", base64.b64decode(png)))
+        if html is not None:
+            archivos.append((f"{base}.html.gz", gzip.compress(html.encode("utf-8"), compresslevel=6)))
+
+        tamano = sum(len(contenido) for _, contenido in archivos)
+        with self._lock:
+            if self.bytes + tamano > self.max_bytes:
+                self._descartar(base, f"superaría el límite de {self.max_bytes / (1024 * 1024):g} MB")
+                return
+            self.bytes += tamano
+            self.guardadas += 1
+
+        for nombre, contenido in archivos:
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                with open(ruta, "wb") as archivo:
+                    archivo.write(contenido)
+                logger.info(f"Captura guardada: {ruta} ({len(contenido) / 1024:.0f} KB)")
+            except Exception as e:
+                logger.error(f"No se pudo guardar la captura {ruta}: {e}")
+        eventos.emitir("captura", archivo=base, bytes=tamano)
+
+    def cerrar(self):
+        """
+        Espera a que se escriban las capturas pendientes y detiene el hilo de escritura.
+        """
+        with self._lock:
+            hilo = self._hilo
+            self._hilo = None
+        if hilo is None:
+            return
+        self._cola.put(None)
+        hilo.join()
+        logger.info(
+            f"Capturas de fallos: {self.guardadas} guardadas "
+            f"({self.bytes / (1024 * 1024):.1f} MB), {self.descartadas} descartadas."
+        )
+
+
+capturas = CapturasFallo()
@@ -0,0 +1,224 @@
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from metricas import metricas
+
+logger = logging.getLogger(__name__)
+
+# Verdadero cuando el documento terminó de cargar y DataTables no está redibujando la tabla
+JS_TABLA_DIBUJADA = """
+if (document.readyState !== 'complete') { return false; }
+if (window.jQuery && window.jQuery.active > 0) { return false; }
+var indicadores = document.querySelectorAll('.dataTables_processing');
+for (var i = 0; i < indicadores.length; i++) {
+    if (window.getComputedStyle(indicadores[i]).display !== 'none') { return false; }
+}
+return true;
+"""
+
+
+class PresupuestoLatencia:
+    """
+    Acumula por fase el tiempo total y el tiempo gastado esperando al navegador.
+
+    Las fases se pueden anidar: cada fase solo contabiliza su tiempo propio, sin el de sus subfases.
+    El tiempo propio también se atribuye a la solicitud activa en las métricas por solicitud.
+    Es seguro usarlo desde varios hilos (por ejemplo, el pool de navegadores).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._fases = {}
+
+    def _pila(self):
+        if not hasattr(self._local, "pila"):
+            self._local.pila = []
+        return self._local.pila
+
+    def _acumular(self, nombre, total=0.0, espera=0.0, ejecuciones=0):
+        with self._lock:
+            fase = self._fases.setdefault(nombre, {"total": 0.0, "espera": 0.0, "ejecuciones": 0})
+            fase["total"] += total
+            fase["espera"] += espera
+            fase["ejecuciones"] += ejecuciones
+
+    @contextmanager
+    def fase(self, nombre):
+        """
+        Mide el tiempo de una fase del proceso (login, navegación, listado, detalle, sheets...).
+
+        :param nombre: Nombre de la fase en el reporte.
+        """
+        pila = self._pila()
+        entrada = {"nombre": nombre, "inicio": time.perf_counter(), "hijos": 0.0}
+        pila.append(entrada)
+        try:
+            yield
+        finally:
+            pila.pop()
+            duracion = time.perf_counter() - entrada["inicio"]
+            self._acumular(nombre, total=duracion - entrada["hijos"], ejecuciones=1)
+            metricas.registrar_paso(nombre, duracion - entrada["hijos"])
+            if pila:
+                pila[-1]["hijos"] += duracion
+
+    def registrar_espera(self, segundos):
+        """
+        Suma un tiempo de espera a la fase activa del hilo actual.
+
+        :param segundos: Duración de la espera.
+        """
+        pila = self._pila()
+        nombre = pila[-1]["nombre"] if pila else "sin_fase"
+        self._acumular(nombre, espera=segundos)
+        if not pila:
+            self._acumular(nombre, total=segundos)
+
+    def reportar(self):
+        """
+        Escribe en el log el reporte de tiempo de espera versus trabajo por fase.
+        """
+        with self._lock:
+            fases = {nombre: dict(valores) for nombre, valores in self._fases.items()}
+
+        if not fases:
+            return
+
+        logger.info("Presupuesto de latencia por fase (espera vs trabajo):")
+        total_espera = total_general = 0.0
+        for nombre, valores in sorted(fases.items(), key=lambda item: item[1]["total"], reverse=True):
+            total = valores["total"]
+            espera = min(valores["espera"], total)
+            porcentaje = (espera / total * 100) if total else 0.0
+            total_general += total
+            total_espera += espera
+            logger.info(
+                f"  {nombre:<12} total {total:8.1f}s | espera {espera:8.1f}s ({porcentaje:5.1f}%) | "
+                f"trabajo {total - espera:8.1f}s | {valores['ejecuciones']} ejecuciones"
+            )
+        logger.info(f"  {'TOTAL':<12} total {total_general:8.1f}s | espera {total_espera:8.1f}s")
+
+
+presupuesto = PresupuestoLatencia()
+
+
+def medir_fase(nombre):
+    """
+    Decorador que contabiliza la ejecución de la función como la fase indicada del presupuesto.
+
+    :param nombre: Nombre de la fase en el reporte.
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with presupuesto.fase(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def esperar(driver, condicion, timeout=10):
+    """
+    Espera una condición del DOM con WebDriverWait y registra el tiempo en el presupuesto de latencia.
+
+    :param driver: Instancia de Selenium WebDriver.
+    :param condicion: Condición aceptada por WebDriverWait.until.
+    :param timeout: Tiempo máximo de espera en segundos.
+    :return: El valor devuelto por la condición.
+    """
+    inicio = time.perf_counter()
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=0.1).until(condicion)
+    finally:
+        presupuesto.registrar_espera(time.perf_counter() - inicio)
+
+
+def esperar_documento_listo(driver, timeout=20):
+    """
+    Espera a que el documento actual termine de cargar.
+    """
+    return esperar(driver, lambda d: d.execute_script("return document.readyState") == "complete", timeout)
+
+
+def esperar_sesion_iniciada(driver, boton_login, timeout=20):
+    """
+    Espera a que el formulario de login desaparezca tras enviarlo y la nueva página termine de cargar.
+
+    :param driver: Instancia de Selenium WebDriver.
+    :param boton_login: Elemento del botón 'Iniciar Sesión' que se presionó.
+    :param timeout: Tiempo máximo de espera en segundos.
+    """
+    def formulario_enviado(d):
+        try:
+            return not boton_login.is_displayed()
+        except StaleElementReferenceException:
+            return True
+
+    esperar(driver, formulario_enviado, timeout)
+    return esperar_documento_listo(driver, timeout)
+
+
+def esperar_tabla_dibujada(driver, timeout=20):
+    """
+    Espera a que DataTables termine de dibujar la tabla (sin indicador 'processing' ni AJAX pendiente).
+    """
+    return esperar(driver, lambda d: d.execute_script(JS_TABLA_DIBUJADA), timeout)
+
+
+def esperar_cambio_pagina(driver, pagina_anterior, timeout=10):
+    """
+    Espera a que la página activa del paginador cambie y la tabla quede redibujada.
+
+    :param driver: Instancia de Selenium WebDriver.
+    :param pagina_anterior: Texto de la página activa antes de hacer clic en 'Siguiente'.
+    :param timeout: Tiempo máximo de espera en segundos.
+    """
+    esperar(
+        driver,
+        lambda d: d.find_element(
+            By.CSS_SELECTOR, "li.paginate_button.page-item.active > a"
+        ).text.strip() != pagina_anterior,
+        timeout
+    )
+    return esperar_tabla_dibujada(driver, timeout)
+
+
+def esperar_colapso_renderizado(driver, metakey="datos_solicitud", timeout=10):
+    """
+    Espera a que el colapso de una sección termine de abrirse y su contenido deje de cambiar
+    (mismo número de etiquetas <strong> en dos lecturas seguidas) y devuelve las etiquetas presentes.
+
+    Con el contenido ya estable, una etiqueta que no está es una etiqueta que la solicitud no tiene:
+    no hace falta esperar su timeout para saberlo.
+
+    :param driver: Instancia de Selenium WebDriver.
+    :param metakey: Parte del id del colapso, igual al data-metakey de la sección.
+    :param timeout: Tiempo máximo de espera en segundos.
+    :return: Lista con el texto de cada etiqueta <strong> del colapso.
+    """
+    selector = f"div[id*='{metakey}'].show:not(.collapsing)"
+    anterior = {"cantidad": None}
+
+    def renderizado(d):
+        if not d.find_elements(By.CSS_SELECTOR, selector):
+            return False
+        etiquetas = d.find_elements(By.CSS_SELECTOR, f"{selector} strong")
+        estable = len(etiquetas) == anterior["cantidad"]
+        anterior["cantidad"] = len(etiquetas)
+        if not estable:
+            return False
+        try:
+            return [etiqueta.text.strip() for etiqueta in etiquetas] or [None]
+        except StaleElementReferenceException:
+            anterior["cantidad"] = None
+            return False
+
+    return [texto for texto in esperar(driver, renderizado, timeout) if texto is not None]
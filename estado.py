@@ -0,0 +1,156 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from modelo import Solicitud
+
+logger = logging.getLogger(__name__)
+
+
+def huella_fila(fila):
+    """
+    Calcula la huella de una fila del listado a partir de sus columnas.
+
+    :param fila: Diccionario {numero_solicitud, columnas}.
+    :return: Hash hexadecimal de las columnas.
+    """
+    contenido = json.dumps(fila.get("columnas") or [], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+
+
+def huellas_filas(filas):
+    """
+    Calcula una sola vez las huellas de todas las filas de un listado.
+
+    :param filas: Filas del listado ({numero_solicitud, columnas}).
+    :return: Diccionario numero_solicitud -> huella.
+    """
+    return {fila["numero_solicitud"]: huella_fila(fila) for fila in filas}
+
+
+class EstadoSolicitudes:
+    """
+    Almacén local (SQLite) con lo último extraído de cada solicitud y la huella de su fila en el listado.
+
+    Permite volver a abrir solo las solicitudes nuevas o cuya fila cambió desde la última ejecución.
+    """
+
+    def __init__(self, ruta, objetivo):
+        """
+        :param ruta: Ruta del archivo SQLite.
+        :param objetivo: Nombre de la tabla/hoja a la que pertenecen las solicitudes (p. ej. 'principal').
+        """
+        self.objetivo = objetivo
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.execute(
+            """
+            CREATE TABLE IF NOT EXISTS solicitudes (
+                objetivo TEXT NOT NULL,
+                numero_solicitud TEXT NOT NULL,
+                huella TEXT NOT NULL,
+                datos TEXT NOT NULL,
+                secciones TEXT NOT NULL,
+                actualizado REAL NOT NULL,
+                PRIMARY KEY (objetivo, numero_solicitud)
+            )
+            """
+        )
+        self._conexion.commit()
+
+    def _cargar(self):
+        with self._lock:
+            cursor = self._conexion.execute(
+                "SELECT numero_solicitud, huella, datos, secciones, actualizado FROM solicitudes WHERE objetivo = ?",
+                (self.objetivo,)
+            )
+            return {fila[0]: fila[1:] for fila in cursor.fetchall()}
+
+    def pendientes(self, filas, max_edad_horas=None, huellas=None):
+        """
+        Devuelve los números de solicitud que hay que volver a extraer.
+
+        :param filas: Filas del listado ({numero_solicitud, columnas}).
+        :param max_edad_horas: Si se indica, también se vuelven a extraer las guardadas hace más tiempo.
+        :param huellas: Huellas ya calculadas con huellas_filas (opcional).
+        :return: Lista de números en el orden del listado.
+        """
+        huellas = huellas if huellas is not None else huellas_filas(filas)
+        guardadas = self._cargar()
+        limite = time.time() - max_edad_horas * 3600 if max_edad_horas else None
+        pendientes = []
+        for fila in filas:
+            guardada = guardadas.get(fila["numero_solicitud"])
+            if guardada is None or guardada[0] != huellas[fila["numero_solicitud"]] or (limite and guardada[3] < limite):
+                pendientes.append(fila["numero_solicitud"])
+
+        logger.info(
+            f"Sincronización incremental '{self.objetivo}': {len(pendientes)} de {len(filas)} solicitudes "
+            f"nuevas o modificadas."
+        )
+        return pendientes
+
+    def guardar(self, huellas, solicitudes):
+        """
+        Guarda las solicitudes recién extraídas junto con la huella de su fila del listado.
+
+        :param huellas: Huellas de las filas del listado (ver huellas_filas), calculadas una vez por objetivo.
+        :param solicitudes: Lista de Solicitud extraídas.
+        """
+        ahora = time.time()
+        registros = []
+        for solicitud in solicitudes:
+            datos, secciones = solicitud.como_extraccion()
+            registros.append((
+                self.objetivo,
+                solicitud.numero_solicitud,
+                huellas.get(solicitud.numero_solicitud, ""),
+                json.dumps(datos, ensure_ascii=False),
+                json.dumps(secciones, ensure_ascii=False),
+                ahora
+            ))
+        with self._lock:
+            self._conexion.executemany(
+                "INSERT OR REPLACE INTO solicitudes "
+                "(objetivo, numero_solicitud, huella, datos, secciones, actualizado) VALUES (?, ?, ?, ?, ?, ?)",
+                registros
+            )
+            self._conexion.commit()
+
+    def resultados(self, filas):
+        """
+        Devuelve lo guardado para cada solicitud del listado, en el orden del listado.
+
+        :param filas: Filas del listado ({numero_solicitud, columnas}).
+        :return: Lista de Solicitud; se omiten las solicitudes nunca extraídas.
+        """
+        guardadas = self._cargar()
+        solicitudes = []
+        for fila in filas:
+            guardada = guardadas.get(fila["numero_solicitud"])
+            if guardada is not None:
+                solicitudes.append(Solicitud.desde_extraccion(json.loads(guardada[1]), json.loads(guardada[2])))
+        return solicitudes
+
+    def purgar(self, filas):
+        """
+        Elimina las solicitudes que ya no aparecen en el listado.
+
+        :param filas: Filas del listado ({numero_solicitud, columnas}).
+        """
+        vigentes = {fila["numero_solicitud"] for fila in filas}
+        obsoletas = [(self.objetivo, numero) for numero in self._cargar() if numero not in vigentes]
+        if obsoletas:
+            with self._lock:
+                self._conexion.executemany(
+                    "DELETE FROM solicitudes WHERE objetivo = ? AND numero_solicitud = ?", obsoletas
+                )
+                self._conexion.commit()
+            logger.info(f"Se eliminaron {len(obsoletas)} solicitudes que ya no están en el listado '{self.objetivo}'.")
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
@@ -0,0 +1,90 @@
+import json
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class FlujoEventos:
+    """
+    Flujo de eventos JSONL de la ejecución (uno por solicitud, por página y por llamada a Sheets)
+    para graficar tendencias entre ejecuciones sin leer el log de texto.
+
+    Los eventos se acumulan en memoria y se escriben juntos cada max_eventos eventos o max_segundos
+    segundos, y al cerrar. Mientras el flujo no está abierto, emitir() no hace nada.
+    Es seguro usarlo desde varios hilos.
+    """
+
+    def __init__(self, max_eventos=200, max_segundos=5):
+        self.max_eventos = max_eventos
+        self.max_segundos = max_segundos
+        self.ejecucion = None
+        self._lock = threading.Lock()
+        self._pendientes = []
+        self._archivo = None
+        self._ultima_escritura = time.monotonic()
+
+    def abrir(self, ruta, **datos):
+        """
+        Abre (en modo anexar) el archivo de eventos y emite el evento 'inicio' de la ejecución.
+
+        :param ruta: Ruta del archivo JSONL.
+        :param datos: Campos adicionales del evento 'inicio' (por ejemplo los objetivos y el modo).
+        """
+        try:
+            with self._lock:
+                self._archivo = open(ruta, "a", encoding="utf-8")
+                self.ejecucion = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+            self.emitir("inicio", **datos)
+        except Exception as e:
+            logger.error(f"No se pudo abrir el archivo de eventos '{ruta}': {e}")
+            self._archivo = None
+
+    def emitir(self, tipo, **campos):
+        """
+        Agrega un evento al flujo.
+
+        :param tipo: Tipo de evento ('solicitud', 'paginas', 'sheets'...).
+        :param campos: Campos del evento; deben ser serializables a JSON (si no, se usa str()).
+        """
+        if self._archivo is None:
+            return
+        linea = json.dumps(
+            {"ts": round(time.time(), 3), "ejecucion": self.ejecucion, "tipo": tipo, **campos},
+            ensure_ascii=False, default=str, separators=(",", ":")
+        )
+        with self._lock:
+            self._pendientes.append(linea)
+            if len(self._pendientes) >= self.max_eventos or \
+                    time.monotonic() - self._ultima_escritura >= self.max_segundos:
+                self._vaciar()
+
+    def _vaciar(self):
+        if self._archivo is None or not self._pendientes:
+            return
+        try:
+            self._archivo.write("\n".join(self._pendientes) + "\n")
+            self._archivo.flush()
+        except Exception as e:
+            logger.error(f"Error escribiendo {len(self._pendientes)} eventos: {e}")
+        self._pendientes.clear()
+        self._ultima_escritura = time.monotonic()
+
+    def cerrar(self, **datos):
+        """
+        Emite el evento 'fin', escribe los eventos pendientes y cierra el archivo.
+
+        :param datos: Campos adicionales del evento 'fin' (por ejemplo la duración y el resultado).
+        """
+        if self._archivo is None:
+            return
+        self.emitir("fin", **datos)
+        with self._lock:
+            self._vaciar()
+            self._archivo.close()
+            self._archivo = None
+
+
+eventos = FlujoEventos()
@@ -0,0 +1,314 @@
+import logging
+import os
+import queue
+import threading
+
+from dotenv import load_dotenv
+
+from esperas import presupuesto
+from metricas import metricas
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Raíz del portal; se puede apuntar a un portal simulado (ver benchmark/portal_simulado.py)
+URL_PORTAL = os.getenv("URL_PORTAL", "https://sistemaderequerimientos.cl").rstrip("/")
+URL_DETALLE_SOLICITUD = URL_PORTAL + "/pe_workflow/externalizacion-personal/{}"
+
+# Campo de 'datos' -> etiqueta <strong> dentro del colapso 'Datos de la solicitud'
+ETIQUETAS_DATOS = {
+    "cargo": "Cargo solicitado:",
+    "sucursal": "Dirección confirmada:",
+    "fecha_inicio": "Fecha de inicio:",
+    "fecha_termino": "Fecha de término:",
+    "causal": "Causal solicitud:",
+    "observaciones": "Observaciones:",
+}
+
+# Campos que muchas solicitudes no traen: en el camino de respaldo se buscan sin esperar ni reintentar
+CAMPOS_OPCIONALES = {"observaciones"}
+
+# XPath equivalente para extraer un campo individual (camino de respaldo)
+XPATH_CAMPO_DATOS = "//div[contains(@id, 'datos_solicitud') and contains(@class, 'show')]//strong[contains(text(), '{}')]/following-sibling::span"
+
+# Clave de 'secciones' -> data-metakey de la sección en el detalle
+METAKEYS_SECCIONES = {
+    "datos_solicitud": "datos_solicitud",
+    "aceptacion_evaluador_rrhh": "aceptacion_evaluador_rrhh",
+    "proveedor_seleccionado": "proveedor_seleccionado",
+    "aceptacion_proveedor": "confirmacion_personal_a_enviar",
+    "cierre_automatico": "cierre_automatico",
+    "rechazos_proveedores": "rechazo_proveedor",
+    "reasignacion_solicitudes": "anulacion_ot",
+}
+
+SELECTOR_BOTON_ACEPTAR = "button.btn-outline-success[data-target='#form-modal-aceptarSolicitudYOT-aceptacion_ot']"
+
+# Devuelve en un solo objeto todas las etiquetas/valores del colapso y los data-metakey presentes
+JS_DATOS_SOLICITUD = """
+var resultado = {campos: {}, metakeys: [], boton_aceptar: false};
+document.querySelectorAll((arguments[1] || "div[id*='datos_solicitud'].show") + " strong").forEach(function (etiqueta) {
+    var texto = etiqueta.textContent.trim();
+    var valor = etiqueta.nextElementSibling;
+    while (valor && valor.tagName !== 'SPAN') { valor = valor.nextElementSibling; }
+    if (valor && !(texto in resultado.campos)) { resultado.campos[texto] = valor.innerText.trim(); }
+});
+document.querySelectorAll("div[data-metakey]").forEach(function (seccion) {
+    resultado.metakeys.push(seccion.getAttribute('data-metakey'));
+});
+resultado.boton_aceptar = document.querySelector(arguments[0]) !== null;
+return resultado;
+"""
+
+
+# Encabezados de la tabla de 'Aceptación del proveedor' en el orden de las columnas de la hoja,
+# separados por coma; por defecto los del portal actual. Vacío = el orden de la tabla en el portal, sin revisar
+COLUMNAS_TABLA_PROVEEDOR = [
+    columna.strip()
+    for columna in os.getenv("COLUMNAS_TABLA_PROVEEDOR", "Proveedor,Trabajador,RUT,Estado,Fecha,Asistencia").split(",")
+    if columna.strip()
+]
+
+# Devuelve la tabla de 'Aceptación del proveedor' completa ({encabezados, filas}) o null si no está
+JS_TABLA_PROVEEDOR = """
+var tabla = null;
+var candidatas = document.querySelectorAll("div.list-group-item.text-sm table");
+for (var i = 0; i < candidatas.length; i++) {
+    if (candidatas[i].getAttribute('class') === 'table table-bordered') { tabla = candidatas[i]; break; }
+}
+if (!tabla) { return null; }
+function texto(celda) { return (celda.innerText || celda.textContent || '').replace(/\\s+/g, ' ').trim(); }
+var encabezados = tabla.tHead ? Array.prototype.map.call(tabla.tHead.querySelectorAll('th, td'), texto) : [];
+var filas = [];
+for (var j = 0; j < tabla.tBodies.length; j++) {
+    Array.prototype.forEach.call(tabla.tBodies[j].rows, function (fila) {
+        filas.push(Array.prototype.map.call(fila.querySelectorAll('td'), texto));
+    });
+}
+return {encabezados: encabezados, filas: filas};
+"""
+
+
+def interpretar_datos_solicitud(resultado, default="N/A"):
+    """
+    Convierte el objeto devuelto por JS_DATOS_SOLICITUD en los diccionarios de campos y secciones.
+
+    :param resultado: Diccionario con 'campos', 'metakeys' y 'boton_aceptar'.
+    :param default: Valor para los campos cuya etiqueta no está en la página.
+    :return: Tuple (campos, secciones).
+    """
+    etiquetas = resultado.get("campos") or {}
+    campos = {}
+    for clave, etiqueta in ETIQUETAS_DATOS.items():
+        # Igual que contains(text(), ...) en el XPath: basta con que la etiqueta contenga el texto
+        valor = next((v for texto, v in etiquetas.items() if etiqueta in texto), None)
+        campos[clave] = valor if valor is not None else default
+
+    metakeys = set(resultado.get("metakeys") or [])
+    secciones = {"boton_aceptar": bool(resultado.get("boton_aceptar"))}
+    for clave, metakey in METAKEYS_SECCIONES.items():
+        secciones[clave] = metakey in metakeys
+    return campos, secciones
+
+
+def extraer_datos_en_lote(driver, default="N/A"):
+    """
+    Extrae los campos de 'Datos de la solicitud' y las secciones presentes con un único execute_script.
+
+    Reemplaza las llamadas por campo a extraer_texto_con_reintentos y los find_elements de detectar_secciones.
+    Requiere que el colapso 'Datos de la solicitud' ya esté expandido.
+
+    :param driver: Instancia de Selenium WebDriver en la página de detalle.
+    :param default: Valor para los campos cuya etiqueta no está en la página.
+    :return: Tuple (campos, secciones).
+    """
+    resultado = driver.execute_script(JS_DATOS_SOLICITUD, SELECTOR_BOTON_ACEPTAR)
+    if not isinstance(resultado, dict):
+        raise ValueError(f"Respuesta inesperada del navegador: {resultado!r}")
+    return interpretar_datos_solicitud(resultado, default)
+
+
+_encabezados_avisados = set()
+
+
+def ordenar_columnas_tabla(encabezados, filas, columnas=None):
+    """
+    Reordena las celdas de la tabla de 'Aceptación del proveedor' según sus encabezados, para que
+    cada columna caiga siempre en la misma columna de la hoja aunque el portal cambie el orden u
+    omita alguna.
+
+    :param encabezados: Textos de los encabezados de la tabla (puede estar vacía).
+    :param filas: Filas de la tabla (listas de textos).
+    :param columnas: Encabezados esperados en el orden de la hoja (por defecto COLUMNAS_TABLA_PROVEEDOR).
+    :return: Filas reordenadas; sin columnas configuradas o sin encabezados, las filas tal cual. Si los
+             encabezados no coinciden con las columnas se avisa una vez por cada conjunto distinto.
+    """
+    columnas = COLUMNAS_TABLA_PROVEEDOR if columnas is None else columnas
+    if not columnas or not encabezados:
+        return filas
+    posiciones = {encabezado.casefold(): indice for indice, encabezado in enumerate(encabezados)}
+    indices = [posiciones.get(columna.casefold()) for columna in columnas]
+    faltantes = [columna for columna, indice in zip(columnas, indices) if indice is None]
+    # Columnas nuevas del portal que no llegan a la hoja
+    esperadas = {columna.casefold() for columna in columnas}
+    sobrantes = [encabezado for encabezado in encabezados if encabezado.casefold() not in esperadas]
+    if (faltantes or sobrantes) and tuple(encabezados) not in _encabezados_avisados:
+        _encabezados_avisados.add(tuple(encabezados))
+        logger.warning(
+            f"Los encabezados de la tabla del proveedor cambiaron: faltan {faltantes} y sobran {sobrantes} "
+            f"(se omiten). Encabezados: {encabezados}. Revisar COLUMNAS_TABLA_PROVEEDOR."
+        )
+    return [[fila[i] if i is not None and i < len(fila) else "" for i in indices] for fila in filas]
+
+
+def _worker_extraccion(id_worker, driver, crear_driver, iniciar_sesion, extraer, cola, resultados):
+    """
+    Procesa solicitudes de la cola compartida con un driver propio hasta vaciarla.
+
+    :param id_worker: Identificador del worker (solo para el log).
+    :param driver: Driver ya autenticado o None para crear uno nuevo.
+    :param crear_driver: Función que devuelve un WebDriver nuevo.
+    :param iniciar_sesion: Función que inicia sesión en el portal con un driver.
+    :param extraer: Función (driver, numero_solicitud) -> (datos, secciones) que no cierra la pestaña.
+    :param cola: Cola con tuplas (indice, numero_solicitud).
+    :param resultados: Cola donde se entrega cada tupla (indice, resultado) y, al terminar, None.
+    """
+    propio = driver is None
+    try:
+        if propio:
+            driver = crear_driver()
+            iniciar_sesion(driver)
+        logger.info(f"Worker {id_worker} listo para extraer solicitudes.")
+
+        while True:
+            try:
+                indice, numero_solicitud = cola.get_nowait()
+            except queue.Empty:
+                break
+
+            resultado = None
+            try:
+                with metricas.solicitud(numero_solicitud):
+                    with presupuesto.fase("abrir"):
+                        driver.get(URL_DETALLE_SOLICITUD.format(numero_solicitud))
+                    resultado = extraer(driver, numero_solicitud)
+                    metricas.anotar_resultado(*(resultado or (None, None)), motor="pool")
+            except Exception as e:
+                logger.error(f"Worker {id_worker}: error procesando solicitud {numero_solicitud}: {e}")
+            finally:
+                resultados.put((indice, resultado))
+                cola.task_done()
+
+    except Exception as e:
+        logger.error(f"Worker {id_worker} terminado con errores: {e}")
+    finally:
+        if propio and driver is not None:
+            try:
+                driver.quit()
+                logger.info(f"Driver del worker {id_worker} cerrado.")
+            except Exception as e:
+                logger.error(f"Error al cerrar el driver del worker {id_worker}: {e}")
+        resultados.put(None)
+
+
+def iterar_por_url(driver, numeros_solicitud, extraer):
+    """
+    Extrae las solicitudes navegando directamente a la URL de detalle en la misma pestaña
+    y entrega cada una apenas se extrae.
+
+    Evita el clic en la tabla, la espera de la pestaña nueva y el cambio de ventana por cada fila.
+
+    :param driver: Instancia de Selenium WebDriver ya autenticada.
+    :param numeros_solicitud: Lista de números de solicitud en el orden de la tabla.
+    :param extraer: Función (driver, numero_solicitud) -> (datos, secciones) que no cierra la pestaña.
+    :return: Generador de tuplas (datos, secciones) en el orden de la tabla.
+    """
+    logger.info(f"Extrayendo {len(numeros_solicitud)} solicitudes por URL directa...")
+    total = 0
+
+    for numero_solicitud in numeros_solicitud:
+        try:
+            with metricas.solicitud(numero_solicitud):
+                with presupuesto.fase("abrir"):
+                    driver.get(URL_DETALLE_SOLICITUD.format(numero_solicitud))
+                datos, secciones = extraer(driver, numero_solicitud)
+                metricas.anotar_resultado(datos, secciones, motor="url")
+        except Exception as e:
+            logger.error(f"Error procesando solicitud {numero_solicitud}: {e}")
+            continue
+        if datos and secciones:
+            total += 1
+            logger.info(f"Solicitud {numero_solicitud} extraída.")
+            yield datos, secciones
+        else:
+            logger.warning(f"Datos incompletos para la solicitud: {numero_solicitud}")
+
+    logger.info(f"Extracción por URL completa. Total de solicitudes: {total}.")
+
+
+def iterar_en_paralelo(numeros_solicitud, crear_driver, iniciar_sesion, extraer, num_workers, driver_principal=None):
+    """
+    Extrae varias solicitudes en paralelo con un pool de navegadores autenticados y entrega
+    cada una apenas un worker la termina (en orden de llegada, no en el de la tabla).
+
+    Cada worker inicia sesión una sola vez y luego toma números de una cola compartida.
+    Si se entrega driver_principal (ya autenticado), se usa como uno de los workers.
+
+    :param numeros_solicitud: Lista de números de solicitud en el orden de la tabla.
+    :param crear_driver: Función que devuelve un WebDriver nuevo.
+    :param iniciar_sesion: Función que inicia sesión en el portal con un driver.
+    :param extraer: Función (driver, numero_solicitud) -> (datos, secciones) que no cierra la pestaña.
+    :param num_workers: Número total de navegadores a usar.
+    :param driver_principal: Driver ya autenticado a reutilizar como primer worker.
+    :return: Generador de tuplas (datos, secciones).
+    """
+    if not numeros_solicitud:
+        return
+
+    num_workers = max(1, min(num_workers, len(numeros_solicitud)))
+    logger.info(f"Extrayendo {len(numeros_solicitud)} solicitudes con {num_workers} navegadores en paralelo...")
+
+    cola = queue.Queue()
+    for indice, numero_solicitud in enumerate(numeros_solicitud):
+        cola.put((indice, numero_solicitud))
+    resultados = queue.Queue()
+
+    for id_worker in range(num_workers):
+        driver = driver_principal if id_worker == 0 else None
+        threading.Thread(
+            target=_worker_extraccion,
+            args=(id_worker, driver, crear_driver, iniciar_sesion, extraer, cola, resultados),
+            name=f"worker-{id_worker}",
+            daemon=True
+        ).start()
+
+    total = 0
+    activos = num_workers
+    try:
+        while activos:
+            entrega = resultados.get()
+            if entrega is None:
+                activos -= 1
+                continue
+            indice, resultado = entrega
+            if resultado and resultado[0] and resultado[1]:
+                total += 1
+                yield resultado
+            else:
+                logger.warning(f"Datos incompletos para la solicitud: {numeros_solicitud[indice]}")
+    finally:
+        if activos:
+            # Se dejó de consumir antes de tiempo: se vacía la cola y se espera a que cada worker
+            # termine su solicitud en curso (el primero usa el driver principal)
+            while True:
+                try:
+                    cola.get_nowait()
+                    cola.task_done()
+                except queue.Empty:
+                    break
+            while activos:
+                if resultados.get() is None:
+                    activos -= 1
+
+    logger.info(f"Extracción en paralelo completa. Total de solicitudes: {total}.")
@@ -0,0 +1,190 @@
+import logging
+import time
+
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from esperas import esperar, esperar_cambio_pagina, medir_fase
+from metricas import metricas
+
+logger = logging.getLogger(__name__)
+
+SELECTOR_NUMERO_SOLICITUD = "td.sorting_1 a.btn.btn-sm.text-orange"
+
+# Convierte una fila de DataTables (array, objeto o <tr>) en {numero_solicitud, columnas}
+JS_FUNCIONES_FILA = """
+function textoCelda(valor) {
+    if (valor === null || valor === undefined) { return ''; }
+    if (typeof valor !== 'string') { valor = String(valor); }
+    var contenedor = document.createElement('div');
+    contenedor.innerHTML = valor;
+    return contenedor.textContent.replace(/\\s+/g, ' ').trim();
+}
+function numeroCelda(valor) {
+    if (typeof valor !== 'string' || valor.indexOf('text-orange') < 0) { return null; }
+    var contenedor = document.createElement('div');
+    contenedor.innerHTML = valor;
+    var enlace = contenedor.querySelector('a.text-orange');
+    return enlace ? enlace.textContent.trim() : null;
+}
+function convertirFila(fila) {
+    var celdas = Array.isArray(fila) ? fila : Object.keys(fila).map(function (k) { return fila[k]; });
+    var numero = null;
+    for (var i = 0; i < celdas.length && numero === null; i++) { numero = numeroCelda(celdas[i]); }
+    var columnas = celdas.map(textoCelda);
+    return {numero_solicitud: numero !== null ? numero : (columnas[0] || ''), columnas: columnas};
+}
+function convertirNodo(tr) {
+    var enlace = tr.querySelector('a.btn.btn-sm.text-orange');
+    var columnas = Array.prototype.map.call(tr.cells, function (td) {
+        return td.textContent.replace(/\\s+/g, ' ').trim();
+    });
+    return {numero_solicitud: enlace ? enlace.textContent.trim() : (columnas[0] || ''), columnas: columnas};
+}
+"""
+
+# Pide al endpoint AJAX de DataTables (server-side) todas las filas en uno o pocos lotes grandes,
+# o lee todas las filas ya cargadas en el cliente (todas las páginas) con la API de DataTables.
+JS_LISTADO_DATATABLES = JS_FUNCIONES_FILA + """
+var tablaId = arguments[0], tamanoLote = arguments[1], listo = arguments[arguments.length - 1];
+try {
+    if (!window.jQuery || !jQuery.fn.dataTable || !jQuery.fn.dataTable.isDataTable('#' + tablaId)) {
+        listo({error: 'DataTables no inicializado para #' + tablaId});
+        return;
+    }
+    var dt = jQuery('#' + tablaId).DataTable();
+    var ajustes = dt.settings()[0];
+    var url = dt.ajax.url();
+
+    if (ajustes.oFeatures.bServerSide && url) {
+        var total = dt.page.info().recordsTotal || tamanoLote;
+        var base = jQuery.extend(true, {}, dt.ajax.params());
+        var tipo = (ajustes.ajax && ajustes.ajax.type) || 'GET';
+        var filas = [], inicio = 0;
+        var pedir = function () {
+            var parametros = jQuery.extend(true, {}, base, {start: inicio, length: tamanoLote, draw: (base.draw || 0) + 1});
+            jQuery.ajax({url: url, type: tipo, data: parametros, dataType: 'json'}).done(function (json) {
+                var datos = json.data || json.aaData || [];
+                datos.forEach(function (fila) { filas.push(convertirFila(fila)); });
+                inicio += tamanoLote;
+                if (datos.length === tamanoLote && inicio < total) { pedir(); }
+                else { listo({origen: 'ajax', filas: filas}); }
+            }).fail(function (xhr) {
+                listo({error: 'AJAX ' + xhr.status + ' ' + xhr.statusText});
+            });
+        };
+        pedir();
+        return;
+    }
+
+    var orden = {order: 'applied', search: 'applied'};
+    var nodos = dt.rows(orden).nodes().toArray();
+    if (nodos.length && nodos.every(function (tr) { return tr; })) {
+        listo({origen: 'nodos', filas: nodos.map(convertirNodo)});
+    } else {
+        listo({origen: 'datos', filas: dt.rows(orden).data().toArray().map(convertirFila)});
+    }
+} catch (e) {
+    listo({error: String(e)});
+}
+"""
+
+# Filas de la página visible de la tabla (un solo round trip por página)
+JS_FILAS_PAGINA = JS_FUNCIONES_FILA + """
+return Array.prototype.map.call(document.querySelectorAll(arguments[0]), function (enlace) {
+    return convertirNodo(enlace.closest('tr'));
+});
+"""
+
+
+def obtener_listado_datatables(driver, tabla_id, tamano_lote=1000, timeout=60):
+    """
+    Obtiene todas las filas de la tabla desde DataTables sin paginar con clics.
+
+    Si la tabla es server-side se piden los datos al endpoint AJAX en lotes de tamano_lote filas;
+    si los datos ya están en el cliente se leen todas las páginas con una sola llamada.
+
+    :param driver: Instancia de Selenium WebDriver con el listado cargado.
+    :param tabla_id: Id de la tabla (por ejemplo 'table-dt_review').
+    :param tamano_lote: Filas pedidas por solicitud al endpoint AJAX.
+    :param timeout: Tiempo máximo para la respuesta del script asíncrono.
+    :return: Lista de diccionarios {numero_solicitud, columnas}.
+    :raises RuntimeError: Si DataTables no está disponible o el endpoint falla.
+    """
+    driver.set_script_timeout(timeout)
+    with metricas.medir("listado", f"datatables {tabla_id}"):
+        resultado = driver.execute_async_script(JS_LISTADO_DATATABLES, tabla_id, tamano_lote)
+    if not isinstance(resultado, dict) or resultado.get("error"):
+        raise RuntimeError(resultado.get("error") if isinstance(resultado, dict) else resultado)
+
+    filas = [fila for fila in resultado["filas"] if fila.get("numero_solicitud")]
+    logger.info(f"Listado '{tabla_id}' obtenido desde DataTables ({resultado['origen']}): {len(filas)} solicitudes.")
+    return filas
+
+
+def obtener_listado_por_paginacion(driver, boton_siguiente_id):
+    """
+    Recorre la tabla página a página con el botón 'Siguiente' (camino de respaldo).
+
+    :param driver: Instancia de Selenium WebDriver con el listado cargado.
+    :param boton_siguiente_id: Id del botón 'Siguiente' de la tabla.
+    :return: Lista de diccionarios {numero_solicitud, columnas}.
+    """
+    filas = []
+    pagina_actual = 1
+
+    while True:
+        inicio_pagina = time.perf_counter()
+        try:
+            esperar(driver, lambda d: d.find_elements(By.CSS_SELECTOR, SELECTOR_NUMERO_SOLICITUD))
+        except TimeoutException:
+            logger.warning(f"No se encontraron solicitudes en la página {pagina_actual}. Terminando.")
+            break
+
+        nuevas = [fila for fila in driver.execute_script(JS_FILAS_PAGINA, SELECTOR_NUMERO_SOLICITUD) if fila["numero_solicitud"]]
+        filas.extend(nuevas)
+        logger.info(f"Página {pagina_actual}: {len(nuevas)} números de solicitud recolectados.")
+
+        try:
+            current_page = driver.find_element(
+                By.CSS_SELECTOR, "li.paginate_button.page-item.active > a"
+            ).text.strip()
+            next_button = driver.find_element(By.ID, boton_siguiente_id)
+            if "disabled" in next_button.get_attribute("class"):
+                break
+
+            driver.execute_script("arguments[0].click();", next_button)
+            esperar_cambio_pagina(driver, current_page)
+            metricas.registrar("paginas", f"pagina {pagina_actual}", time.perf_counter() - inicio_pagina)
+            pagina_actual += 1
+        except TimeoutException:
+            logger.warning("No se detectó cambio de página después de hacer clic en 'Siguiente'. Terminando.")
+            break
+        except NoSuchElementException:
+            logger.warning("No se encontró el botón 'Siguiente'. Terminando.")
+            break
+
+    return filas
+
+
+@medir_fase("listado")
+def obtener_listado(driver, tabla_id, boton_siguiente_id):
+    """
+    Devuelve todas las filas del listado: primero vía DataTables/AJAX y, si falla, paginando con clics.
+
+    :param driver: Instancia de Selenium WebDriver con el listado cargado.
+    :param tabla_id: Id de la tabla (por ejemplo 'table-dt_review').
+    :param boton_siguiente_id: Id del botón 'Siguiente' para el camino de respaldo.
+    :return: Lista de diccionarios {numero_solicitud, columnas} en el orden de la tabla.
+    """
+    try:
+        filas = obtener_listado_datatables(driver, tabla_id)
+        if filas:
+            return filas
+        logger.warning(f"DataTables no devolvió filas para '{tabla_id}'. Paginando con clics.")
+    except Exception as e:
+        logger.warning(f"No se pudo leer el listado '{tabla_id}' desde DataTables: {e}. Paginando con clics.")
+
+    filas = obtener_listado_por_paginacion(driver, boton_siguiente_id)
+    logger.info(f"Total de solicitudes recolectadas paginando: {len(filas)}.")
+    return filas
@@ -0,0 +1,293 @@
+import csv
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from eventos import eventos
+
+logger = logging.getLogger(__name__)
+
+
+def percentil(valores, p):
+    """
+    Percentil por rango más cercano.
+
+    :param valores: Lista de números.
+    :param p: Percentil entre 0 y 100.
+    :return: El valor del percentil, o 0.0 si la lista está vacía.
+    """
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = max(0, math.ceil(p / 100 * len(ordenados)) - 1)
+    return ordenados[indice]
+
+
+def _estadisticas(valores):
+    return {
+        "n": len(valores),
+        "total": round(sum(valores), 3),
+        "p50": round(percentil(valores, 50), 3),
+        "p95": round(percentil(valores, 95), 3),
+        "p99": round(percentil(valores, 99), 3),
+        "max": round(max(valores), 3) if valores else 0.0
+    }
+
+
+class MetricasEjecucion:
+    """
+    Tiempos por solicitud (abrir, expandir, campos, secciones...), por página del listado y por
+    llamada a Sheets, con el número de reintentos, para el resumen estructurado de la ejecución.
+
+    Los pasos medidos con presupuesto.fase se atribuyen a la solicitud activa del hilo actual
+    (ver solicitud()). Es seguro usarlo desde varios hilos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._solicitudes = {}
+        self._eventos = {}
+        self._reintentos = {}
+        self._al_terminar = []
+
+    def _registro(self, numero_solicitud):
+        return self._solicitudes.setdefault(numero_solicitud, {"total": 0.0, "pasos": {}, "reintentos": 0})
+
+    @contextmanager
+    def solicitud(self, numero_solicitud):
+        """
+        Marca la solicitud que el hilo actual está procesando, mide su tiempo total y al terminar
+        emite su evento 'solicitud' (pasos, reintentos y lo anotado con anotar_resultado).
+
+        :param numero_solicitud: Número de la solicitud.
+        """
+        anterior = getattr(self._local, "actual", None)
+        evento_anterior = getattr(self._local, "evento", None)
+        evento = {"pasos": {}, "reintentos": 0}
+        self._local.actual = numero_solicitud
+        self._local.evento = evento
+        inicio = time.perf_counter()
+        fallida = False
+        try:
+            yield
+        except Exception as e:
+            fallida = True
+            evento.update(resultado="error", error=str(e))
+            raise
+        finally:
+            duracion = time.perf_counter() - inicio
+            self._local.actual = anterior
+            self._local.evento = evento_anterior
+            for funcion in self._al_terminar:
+                funcion(numero_solicitud, fallida)
+            with self._lock:
+                self._registro(numero_solicitud)["total"] += duracion
+            pasos = {nombre: round(segundos, 3) for nombre, segundos in evento.pop("pasos").items()}
+            eventos.emitir(
+                "solicitud", numero_solicitud=numero_solicitud, duracion=round(duracion, 3),
+                pasos=pasos, **{"resultado": "sin_resultado", **evento}
+            )
+
+    def anotar_resultado(self, datos, secciones, **campos):
+        """
+        Anota en el evento de la solicitud activa del hilo el resultado de la extracción.
+
+        :param datos: Datos extraídos (None si la extracción falló).
+        :param secciones: Diccionario de secciones (None si la extracción falló).
+        :param campos: Campos adicionales del evento (por ejemplo la página del listado).
+        """
+        evento = getattr(self._local, "evento", None)
+        if evento is None:
+            return
+        evento["resultado"] = "ok" if datos and secciones else "incompleta"
+        evento["secciones"] = [clave for clave, presente in (secciones or {}).items() if presente]
+        evento.update(campos)
+
+    def anotar(self, **campos):
+        """
+        Agrega campos al evento de la solicitud activa del hilo (si hay una).
+        """
+        evento = getattr(self._local, "evento", None)
+        if evento is not None:
+            evento.update(campos)
+
+    def al_terminar_solicitud(self, funcion):
+        """
+        Registra una función que se llama, en el hilo de la solicitud, cada vez que termina una.
+
+        :param funcion: Función (numero_solicitud, fallida) -> None; fallida es True si la solicitud
+                        terminó con una excepción.
+        """
+        self._al_terminar.append(funcion)
+
+    def solicitud_actual(self):
+        """
+        :return: Número de la solicitud activa en el hilo actual, o None.
+        """
+        return getattr(self._local, "actual", None)
+
+    def registrar_paso(self, nombre, segundos):
+        """
+        Suma la duración de un paso a la solicitud activa del hilo (si hay una).
+
+        :param nombre: Nombre del paso (por ejemplo 'expandir').
+        :param segundos: Duración del paso.
+        """
+        numero_solicitud = getattr(self._local, "actual", None)
+        if numero_solicitud is None:
+            return
+        evento = self._local.evento
+        evento["pasos"][nombre] = evento["pasos"].get(nombre, 0.0) + segundos
+        with self._lock:
+            pasos = self._registro(numero_solicitud)["pasos"]
+            pasos[nombre] = pasos.get(nombre, 0.0) + segundos
+
+    def registrar_solicitud(self, numero_solicitud, total, pasos=None, **evento):
+        """
+        Registra de una vez una solicitud medida fuera de un hilo propio (por ejemplo, en asyncio)
+        y emite su evento 'solicitud'.
+
+        :param numero_solicitud: Número de la solicitud.
+        :param total: Duración total en segundos.
+        :param pasos: Diccionario nombre -> segundos.
+        :param evento: Campos adicionales del evento (resultado, secciones...).
+        """
+        with self._lock:
+            registro = self._registro(numero_solicitud)
+            registro["total"] += total
+            for nombre, segundos in (pasos or {}).items():
+                registro["pasos"][nombre] = registro["pasos"].get(nombre, 0.0) + segundos
+        eventos.emitir(
+            "solicitud", numero_solicitud=numero_solicitud, duracion=round(total, 3),
+            pasos={nombre: round(segundos, 3) for nombre, segundos in (pasos or {}).items()},
+            reintentos=0, **evento
+        )
+
+    def registrar_reintento(self, nombre):
+        """
+        Cuenta un reintento (de la solicitud activa, si hay una).
+
+        :param nombre: Qué se reintentó (por ejemplo 'campo', 'expandir' o 'sheets').
+        """
+        numero_solicitud = getattr(self._local, "actual", None)
+        if numero_solicitud is not None:
+            self._local.evento["reintentos"] += 1
+        with self._lock:
+            self._reintentos[nombre] = self._reintentos.get(nombre, 0) + 1
+            if numero_solicitud is not None:
+                self._registro(numero_solicitud)["reintentos"] += 1
+
+    def registrar(self, categoria, nombre, segundos, **detalle):
+        """
+        Registra la duración de una operación que no pertenece a una solicitud y emite su evento.
+
+        :param categoria: Grupo del resumen y tipo del evento (por ejemplo 'paginas' o 'sheets').
+        :param nombre: Operación concreta (por ejemplo 'pagina 3' o 'batchUpdate').
+        :param segundos: Duración.
+        :param detalle: Campos adicionales del evento (por ejemplo las filas escritas).
+        """
+        with self._lock:
+            self._eventos.setdefault(categoria, []).append((nombre, segundos))
+        eventos.emitir(categoria, operacion=nombre, duracion=round(segundos, 3), **detalle)
+
+    @contextmanager
+    def medir(self, categoria, nombre):
+        """
+        Mide el bloque y lo registra con registrar(categoria, nombre, ...).
+
+        Entrega un diccionario donde el bloque puede anotar campos adicionales del evento; si el
+        bloque lanza una excepción, el evento lleva resultado 'error'.
+        """
+        detalle = {}
+        inicio = time.perf_counter()
+        try:
+            yield detalle
+        except Exception as e:
+            detalle.update(resultado="error", error=str(e))
+            raise
+        finally:
+            self.registrar(categoria, nombre, time.perf_counter() - inicio, **{"resultado": "ok", **detalle})
+
+    def resumen(self, mas_lentas=10):
+        """
+        Calcula p50/p95/p99 por paso y por categoría, los reintentos y las solicitudes más lentas.
+
+        :param mas_lentas: Cuántas solicitudes lentas incluir.
+        :return: Diccionario serializable a JSON.
+        """
+        with self._lock:
+            solicitudes = {numero: {"total": r["total"], "pasos": dict(r["pasos"]), "reintentos": r["reintentos"]}
+                           for numero, r in self._solicitudes.items()}
+            eventos = {categoria: list(valores) for categoria, valores in self._eventos.items()}
+            reintentos = dict(self._reintentos)
+
+        pasos = {}
+        for registro in solicitudes.values():
+            for nombre, segundos in registro["pasos"].items():
+                pasos.setdefault(nombre, []).append(segundos)
+
+        lentas = sorted(solicitudes.items(), key=lambda item: item[1]["total"], reverse=True)[:mas_lentas]
+        return {
+            "solicitudes": _estadisticas([r["total"] for r in solicitudes.values()]),
+            "pasos": {nombre: _estadisticas(valores) for nombre, valores in pasos.items()},
+            "categorias": {
+                categoria: {
+                    "resumen": _estadisticas([segundos for _, segundos in valores]),
+                    "por_operacion": {
+                        nombre: _estadisticas([s for n, s in valores if n == nombre])
+                        for nombre in dict.fromkeys(n for n, _ in valores)
+                    }
+                }
+                for categoria, valores in eventos.items()
+            },
+            "reintentos": reintentos,
+            "mas_lentas": [
+                {
+                    "numero_solicitud": numero,
+                    "total": round(r["total"], 3),
+                    "reintentos": r["reintentos"],
+                    "pasos": {nombre: round(segundos, 3) for nombre, segundos in r["pasos"].items()}
+                }
+                for numero, r in lentas
+            ]
+        }
+
+    def escribir(self, ruta_json, ruta_csv=None):
+        """
+        Escribe el resumen en JSON y, si se indica, una fila CSV por solicitud con sus pasos.
+
+        :param ruta_json: Ruta del archivo JSON.
+        :param ruta_csv: Ruta del archivo CSV (opcional).
+        """
+        try:
+            resumen = self.resumen()
+            with open(ruta_json, "w", encoding="utf-8") as archivo:
+                json.dump(resumen, archivo, ensure_ascii=False, indent=2)
+
+            if ruta_csv:
+                with self._lock:
+                    solicitudes = {numero: dict(r, pasos=dict(r["pasos"])) for numero, r in self._solicitudes.items()}
+                nombres_pasos = sorted({nombre for r in solicitudes.values() for nombre in r["pasos"]})
+                with open(ruta_csv, "w", encoding="utf-8", newline="") as archivo:
+                    escritor = csv.writer(archivo)
+                    escritor.writerow(["numero_solicitud", "total", "reintentos"] + nombres_pasos)
+                    for numero, r in solicitudes.items():
+                        escritor.writerow(
+                            [numero, f"{r['total']:.3f}", r["reintentos"]] +
+                            [f"{r['pasos'].get(nombre, 0.0):.3f}" for nombre in nombres_pasos]
+                        )
+
+            s = resumen["solicitudes"]
+            logger.info(
+                f"Métricas: {s['n']} solicitudes, p50 {s['p50']:.2f}s, p95 {s['p95']:.2f}s, p99 {s['p99']:.2f}s. "
+                f"Detalle en '{ruta_json}'."
+            )
+        except Exception as e:
+            logger.error(f"Error escribiendo las métricas de la ejecución: {e}")
+
+
+metricas = MetricasEjecucion()
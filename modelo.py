@@ -0,0 +1,124 @@
+from dataclasses import dataclass
+from enum import IntFlag
+
+
+class Seccion(IntFlag):
+    """
+    Secciones presentes en el detalle de una solicitud, empaquetadas en un entero.
+    """
+    BOTON_ACEPTAR = 1
+    DATOS_SOLICITUD = 2
+    ACEPTACION_EVALUADOR_RRHH = 4
+    PROVEEDOR_SELECCIONADO = 8
+    ACEPTACION_PROVEEDOR = 16
+    CIERRE_AUTOMATICO = 32
+    RECHAZOS_PROVEEDORES = 64
+    REASIGNACION_SOLICITUDES = 128
+
+
+# Clave del diccionario 'secciones' de los extractores -> bandera, en el orden de las columnas de la hoja
+BANDERAS_SECCIONES = {
+    "boton_aceptar": Seccion.BOTON_ACEPTAR,
+    "datos_solicitud": Seccion.DATOS_SOLICITUD,
+    "aceptacion_evaluador_rrhh": Seccion.ACEPTACION_EVALUADOR_RRHH,
+    "proveedor_seleccionado": Seccion.PROVEEDOR_SELECCIONADO,
+    "aceptacion_proveedor": Seccion.ACEPTACION_PROVEEDOR,
+    "cierre_automatico": Seccion.CIERRE_AUTOMATICO,
+    "rechazos_proveedores": Seccion.RECHAZOS_PROVEEDORES,
+    "reasignacion_solicitudes": Seccion.REASIGNACION_SOLICITUDES,
+}
+
+CAMPOS_TEXTO = ("cargo", "sucursal", "fecha_inicio", "fecha_termino", "causal", "observaciones", "link")
+
+_VALORES_SECCIONES = [(clave, bandera.value) for clave, bandera in BANDERAS_SECCIONES.items()]
+
+# Columnas 'Sí'/'No' de la hoja para cada combinación posible de banderas
+_COLUMNAS_SECCIONES = [
+    ["Sí" if valor & bandera else "No" for _, bandera in _VALORES_SECCIONES]
+    for valor in range(1 << len(BANDERAS_SECCIONES))
+]
+
+
+@dataclass(slots=True)
+class Solicitud:
+    """
+    Una solicitud extraída: sus campos, las secciones presentes como banderas y, si corresponde,
+    las filas de la tabla de 'Aceptación del proveedor'.
+    """
+    numero_solicitud: str
+    cargo: str = ""
+    sucursal: str = ""
+    fecha_inicio: str = ""
+    fecha_termino: str = ""
+    causal: str = ""
+    observaciones: str = ""
+    link: str = ""
+    # Banderas de Seccion como entero (Seccion(secciones) para verlas por nombre)
+    secciones: int = 0
+    tabla_aceptacion_proveedor: list | None = None
+
+    @classmethod
+    def desde_extraccion(cls, datos, secciones):
+        """
+        Crea el registro a partir de la tupla (datos, secciones) que devuelven los extractores.
+
+        :param datos: Diccionario con los datos extraídos (incluye numero_solicitud).
+        :param secciones: Diccionario clave -> bool con las secciones presentes.
+        :return: Solicitud.
+        """
+        banderas = 0
+        for clave, bandera in _VALORES_SECCIONES:
+            if secciones.get(clave):
+                banderas |= bandera
+        return cls(
+            str(datos["numero_solicitud"]),
+            *(datos.get(campo) or "" for campo in CAMPOS_TEXTO),
+            secciones=banderas,
+            tabla_aceptacion_proveedor=datos.get("tabla_aceptacion_proveedor")
+        )
+
+    def como_extraccion(self):
+        """
+        Devuelve la solicitud como la tupla (datos, secciones) de los extractores, por ejemplo para
+        guardarla en JSON.
+
+        :return: Tuple (datos, secciones).
+        """
+        datos = {"numero_solicitud": self.numero_solicitud}
+        datos.update((campo, getattr(self, campo)) for campo in CAMPOS_TEXTO)
+        if self.tabla_aceptacion_proveedor is not None:
+            datos["tabla_aceptacion_proveedor"] = self.tabla_aceptacion_proveedor
+        secciones = {clave: bool(self.secciones & bandera) for clave, bandera in _VALORES_SECCIONES}
+        return datos, secciones
+
+    def tiene(self, seccion):
+        """
+        :param seccion: Bandera de Seccion.
+        :return: True si la sección está presente.
+        """
+        return bool(self.secciones & seccion)
+
+
+def filas_hoja(solicitudes, expandir_tabla=False):
+    """
+    Convierte las solicitudes en las filas de la hoja de cálculo.
+
+    Las columnas 'Sí'/'No' de las secciones salen de una tabla precalculada indexada por las banderas,
+    así que cada fila se arma con una sola concatenación de listas.
+
+    :param solicitudes: Lista de Solicitud.
+    :param expandir_tabla: Si es True, se escribe una fila por cada fila de 'tabla_aceptacion_proveedor'.
+    :return: Lista de filas (listas de valores).
+    """
+    filas = []
+    for s in solicitudes:
+        base = [
+            s.numero_solicitud, "", s.cargo, s.sucursal, s.fecha_inicio, s.fecha_termino,
+            s.causal, s.observaciones, "", s.link
+        ] + _COLUMNAS_SECCIONES[s.secciones]
+        tabla = s.tabla_aceptacion_proveedor if expandir_tabla else None
+        if tabla:
+            filas.extend(base + fila for fila in tabla)
+        else:
+            filas.append(base)
+    return filas
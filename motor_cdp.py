@@ -0,0 +1,347 @@
+import asyncio
+import itertools
+import json
+import logging
+import queue
+import threading
+import time
+
+import requests
+import websocket
+
+from eventos import eventos
+from metricas import metricas
+from extraccion_detalle import (
+    URL_DETALLE_SOLICITUD,
+    SELECTOR_BOTON_ACEPTAR,
+    JS_DATOS_SOLICITUD,
+    JS_TABLA_PROVEEDOR,
+    interpretar_datos_solicitud,
+    ordenar_columnas_tabla,
+    iterar_por_url
+)
+
+logger = logging.getLogger(__name__)
+
+# Los mismos datos que JS_DATOS_SOLICITUD, sin exigir que el colapso esté expandido (el contenido
+# ya está en el DOM), más la tabla de 'Aceptación del proveedor'
+JS_DETALLE_CDP = """
+(function () {
+    var resultado = (function () {
+""" + JS_DATOS_SOLICITUD + """
+    }).apply(null, %s);
+""" % json.dumps([SELECTOR_BOTON_ACEPTAR, "div[id*='datos_solicitud']"]) + """
+    var tabla = (function () {
+""" + JS_TABLA_PROVEEDOR + """
+    })();
+    resultado.tabla = tabla ? tabla.filas : [];
+    resultado.encabezados = tabla ? tabla.encabezados : [];
+    return resultado;
+})()
+"""
+
+
+class ErrorCDP(Exception):
+    """Error devuelto por Chrome a un comando del protocolo DevTools."""
+
+
+def _normalizar(texto):
+    # Igual que WebElement.text en una sola línea: espacios colapsados y sin bordes
+    return " ".join((texto or "").split())
+
+
+def obtener_url_depuracion(driver):
+    """
+    Devuelve la URL WebSocket del navegador (nivel browser) que ChromeDriver dejó abierta.
+
+    :param driver: Instancia de Selenium WebDriver (Chrome).
+    :return: URL ws:// del endpoint DevTools del navegador.
+    """
+    direccion = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+    respuesta = requests.get(f"http://{direccion}/json/version", timeout=10)
+    respuesta.raise_for_status()
+    return respuesta.json()["webSocketDebuggerUrl"]
+
+
+class ClienteCDP:
+    """
+    Conexión al protocolo DevTools del navegador con sesiones planas (flatten) por pestaña.
+
+    Un hilo lee el WebSocket y resuelve las respuestas y eventos como futures del bucle asyncio,
+    así varias pestañas pueden navegar y esperar su carga a la vez sobre la misma conexión.
+    """
+
+    def __init__(self, url_ws, loop):
+        """
+        :param url_ws: URL WebSocket del navegador (ver obtener_url_depuracion).
+        :param loop: Bucle asyncio en el que se resuelven los futures.
+        """
+        self._loop = loop
+        self._ws = websocket.create_connection(url_ws, suppress_origin=True, enable_multithread=True)
+        self._ids = itertools.count(1)
+        self._pendientes = {}
+        self._esperas = []
+        self._lock = threading.Lock()
+        self._lector = threading.Thread(target=self._leer, name="lector-cdp", daemon=True)
+        self._lector.start()
+
+    def _leer(self):
+        while True:
+            try:
+                mensaje = json.loads(self._ws.recv())
+            except Exception as e:
+                error = ConnectionError(f"Conexión CDP cerrada: {e}")
+                with self._lock:
+                    futuros = list(self._pendientes.values()) + [futuro for _, _, futuro in self._esperas]
+                    self._pendientes.clear()
+                    self._esperas.clear()
+                for futuro in futuros:
+                    self._entregar(futuro, None, error)
+                return
+            if not isinstance(mensaje, dict):
+                continue
+
+            with self._lock:
+                if "id" in mensaje:
+                    futuros = [self._pendientes.pop(mensaje["id"], None)]
+                else:
+                    clave = (mensaje.get("method"), mensaje.get("sessionId"))
+                    futuros = [futuro for metodo, sesion, futuro in self._esperas if (metodo, sesion) == clave]
+                    self._esperas = [espera for espera in self._esperas if espera[2] not in futuros]
+
+            error = ErrorCDP(mensaje["error"].get("message")) if "error" in mensaje else None
+            resultado = mensaje.get("result", mensaje.get("params"))
+            for futuro in futuros:
+                if futuro is not None:
+                    self._entregar(futuro, resultado, error)
+
+    def _entregar(self, futuro, resultado, error):
+        try:
+            self._loop.call_soon_threadsafe(self._resolver, futuro, resultado, error)
+        except RuntimeError:
+            # El bucle ya terminó (conexión cerrada al final de la extracción)
+            pass
+
+    @staticmethod
+    def _resolver(futuro, resultado, error):
+        if futuro.done():
+            return
+        if error is not None:
+            futuro.set_exception(error)
+        else:
+            futuro.set_result(resultado)
+
+    def enviar(self, metodo, params=None, session_id=None):
+        """
+        Envía un comando y devuelve un future con su resultado.
+
+        :param metodo: Método CDP (por ejemplo 'Page.navigate').
+        :param params: Parámetros del comando.
+        :param session_id: Sesión de la pestaña; None para comandos del navegador.
+        :return: Future que se resuelve con el 'result' de la respuesta.
+        """
+        futuro = self._loop.create_future()
+        mensaje = {"id": next(self._ids), "method": metodo, "params": params or {}}
+        if session_id:
+            mensaje["sessionId"] = session_id
+        with self._lock:
+            self._pendientes[mensaje["id"]] = futuro
+        self._ws.send(json.dumps(mensaje))
+        return futuro
+
+    def esperar_evento(self, metodo, session_id):
+        """
+        Registra la espera de un evento de una pestaña; hay que llamarlo antes del comando que lo provoca.
+
+        :return: Future que se resuelve con los 'params' del evento.
+        """
+        futuro = self._loop.create_future()
+        with self._lock:
+            self._esperas.append((metodo, session_id, futuro))
+        return futuro
+
+    def descartar_espera(self, futuro):
+        """
+        Quita una espera registrada con esperar_evento que ya no se va a usar (por ejemplo tras un timeout).
+
+        :param futuro: Future devuelto por esperar_evento.
+        """
+        with self._lock:
+            self._esperas = [espera for espera in self._esperas if espera[2] is not futuro]
+        futuro.cancel()
+
+    def cerrar(self):
+        try:
+            self._ws.close()
+        except Exception as e:
+            logger.debug(f"Error cerrando la conexión CDP: {e}")
+
+
+async def extraer_detalle_cdp(cliente, numero_solicitud, incluir_tabla=False, urls_bloqueadas=None, timeout=30):
+    """
+    Abre el detalle de una solicitud en una pestaña nueva del navegador ya autenticado, espera su
+    carga sin bloquear y extrae los mismos datos que ingresar_y_extraer_datos.
+
+    :param cliente: ClienteCDP conectado al navegador.
+    :param numero_solicitud: Número de la solicitud.
+    :param incluir_tabla: Si es True, agrega 'tabla_aceptacion_proveedor' a los datos.
+    :param urls_bloqueadas: Patrones de URL que la pestaña no descarga (perfil ligero).
+    :param timeout: Tiempo máximo por comando y para la carga de la página, en segundos.
+    :return: Tuple (datos, secciones).
+    """
+    link = URL_DETALLE_SOLICITUD.format(numero_solicitud)
+    inicio = time.perf_counter()
+    objetivo = await asyncio.wait_for(cliente.enviar("Target.createTarget", {"url": "about:blank"}), timeout)
+    try:
+        adjunto = await asyncio.wait_for(
+            cliente.enviar("Target.attachToTarget", {"targetId": objetivo["targetId"], "flatten": True}), timeout
+        )
+        sesion = adjunto["sessionId"]
+        await asyncio.wait_for(cliente.enviar("Page.enable", session_id=sesion), timeout)
+        if urls_bloqueadas:
+            await asyncio.wait_for(cliente.enviar("Network.enable", session_id=sesion), timeout)
+            await asyncio.wait_for(
+                cliente.enviar("Network.setBlockedURLs", {"urls": urls_bloqueadas}, session_id=sesion), timeout
+            )
+
+        cargada = cliente.esperar_evento("Page.domContentEventFired", sesion)
+        try:
+            navegacion = await asyncio.wait_for(cliente.enviar("Page.navigate", {"url": link}, session_id=sesion), timeout)
+            if navegacion.get("errorText"):
+                raise ErrorCDP(f"No se pudo abrir {link}: {navegacion['errorText']}")
+            await asyncio.wait_for(cargada, timeout)
+        finally:
+            # Si la carga no llegó (timeout o error), la espera no debe quedar registrada en el cliente
+            cliente.descartar_espera(cargada)
+        abierta = time.perf_counter()
+
+        evaluacion = await asyncio.wait_for(
+            cliente.enviar("Runtime.evaluate", {"expression": JS_DETALLE_CDP, "returnByValue": True}, session_id=sesion),
+            timeout
+        )
+        if evaluacion.get("exceptionDetails"):
+            raise ErrorCDP(f"Error evaluando el detalle: {evaluacion['exceptionDetails'].get('text')}")
+        resultado = evaluacion["result"]["value"]
+        fin = time.perf_counter()
+    finally:
+        try:
+            await asyncio.wait_for(cliente.enviar("Target.closeTarget", {"targetId": objetivo["targetId"]}), timeout)
+        except Exception as e:
+            logger.debug(f"No se pudo cerrar la pestaña de la solicitud {numero_solicitud}: {e}")
+
+    if "datos_solicitud" not in resultado.get("metakeys", []):
+        raise ErrorCDP(f"El detalle de la solicitud {numero_solicitud} no trae 'Datos de la solicitud'")
+
+    resultado["campos"] = {_normalizar(etiqueta): _normalizar(valor) for etiqueta, valor in resultado["campos"].items()}
+    campos, secciones = interpretar_datos_solicitud(resultado)
+    datos = {"numero_solicitud": numero_solicitud, **campos, "link": link}
+    if incluir_tabla:
+        tabla = ordenar_columnas_tabla(
+            [_normalizar(encabezado) for encabezado in resultado.get("encabezados", [])],
+            [[_normalizar(celda) for celda in fila] for fila in resultado.get("tabla", [])]
+        )
+        datos["tabla_aceptacion_proveedor"] = tabla if secciones["aceptacion_proveedor"] and tabla else None
+    metricas.registrar_solicitud(
+        numero_solicitud, fin - inicio, {"abrir": abierta - inicio, "campos": fin - abierta},
+        resultado="ok", secciones=[clave for clave, presente in secciones.items() if presente], motor="cdp"
+    )
+    return datos, secciones
+
+
+async def _extraer_todas(url_ws, numeros_solicitud, incluir_tabla, num_pestanas, urls_bloqueadas, entregar, detener):
+    cliente = ClienteCDP(url_ws, asyncio.get_running_loop())
+    limite = asyncio.Semaphore(num_pestanas)
+
+    async def extraer(numero_solicitud):
+        async with limite:
+            if detener.is_set():
+                return
+            try:
+                entregar((numero_solicitud, await extraer_detalle_cdp(
+                    cliente, numero_solicitud, incluir_tabla, urls_bloqueadas
+                )))
+            except Exception as e:
+                logger.warning(f"Extracción CDP fallida para la solicitud {numero_solicitud}: {e}")
+                # No es un error de la solicitud: se vuelve a extraer con Selenium, que emite su propio resultado
+                eventos.emitir(
+                    "solicitud", numero_solicitud=numero_solicitud, resultado="reintento", error=str(e), motor="cdp"
+                )
+                entregar((numero_solicitud, None))
+
+    try:
+        await asyncio.gather(*(extraer(numero) for numero in numeros_solicitud))
+    finally:
+        cliente.cerrar()
+
+
+def iterar_por_cdp(driver, numeros_solicitud, extraer_selenium, incluir_tabla=False, num_pestanas=4, urls_bloqueadas=None):
+    """
+    Extrae las solicitudes abriendo hasta num_pestanas pestañas a la vez dentro del mismo Chrome
+    ya autenticado (comparten cookies), orquestadas con asyncio sobre el protocolo DevTools.
+    Entrega cada solicitud apenas termina; las que fallen se extraen al final con Selenium.
+
+    :param driver: Driver autenticado; su navegador aloja las pestañas y se usa como respaldo.
+    :param numeros_solicitud: Lista de números de solicitud en el orden de la tabla.
+    :param extraer_selenium: Función (driver, numero_solicitud) -> (datos, secciones) que no cierra la pestaña.
+    :param incluir_tabla: Si es True, incluye la tabla de 'Aceptación del proveedor'.
+    :param num_pestanas: Número de pestañas concurrentes.
+    :param urls_bloqueadas: Patrones de URL que las pestañas no descargan (perfil ligero).
+    :return: Generador de tuplas (datos, secciones).
+    """
+    if not numeros_solicitud:
+        return
+
+    logger.info(f"Extrayendo {len(numeros_solicitud)} solicitudes por CDP con {num_pestanas} pestañas concurrentes...")
+    fallidos = []
+    total = 0
+    try:
+        url_ws = obtener_url_depuracion(driver)
+    except Exception as e:
+        logger.warning(f"No se pudo conectar al protocolo DevTools del navegador: {e}")
+        fallidos = list(numeros_solicitud)
+    else:
+        resultados = queue.Queue()
+        fin = object()
+        detener = threading.Event()
+
+        def ejecutar():
+            try:
+                asyncio.run(_extraer_todas(
+                    url_ws, numeros_solicitud, incluir_tabla, num_pestanas, urls_bloqueadas, resultados.put, detener
+                ))
+            except Exception as e:
+                logger.error(f"Extracción CDP terminada con errores: {e}")
+            finally:
+                resultados.put(fin)
+
+        threading.Thread(target=ejecutar, name="motor-cdp", daemon=True).start()
+        pendientes = set(numeros_solicitud)
+        terminado = False
+        try:
+            while True:
+                entrega = resultados.get()
+                if entrega is fin:
+                    terminado = True
+                    break
+                numero_solicitud, resultado = entrega
+                pendientes.discard(numero_solicitud)
+                if resultado is None:
+                    fallidos.append(numero_solicitud)
+                    continue
+                total += 1
+                yield resultado
+        finally:
+            if not terminado:
+                # Se dejó de consumir antes de tiempo: no se abren más pestañas y se esperan las abiertas
+                detener.set()
+                while resultados.get() is not fin:
+                    pass
+        fallidos.extend(numero for numero in numeros_solicitud if numero in pendientes)
+
+    if fallidos:
+        logger.warning(f"{len(fallidos)} solicitudes se extraerán con Selenium como respaldo.")
+        for resultado in iterar_por_url(driver, fallidos, extraer_selenium):
+            total += 1
+            yield resultado
+
+    logger.info(f"Extracción CDP completa. Total de solicitudes: {total}.")
@@ -0,0 +1,333 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metricas import metricas
+from extraccion_detalle import (
+    URL_PORTAL,
+    URL_DETALLE_SOLICITUD,
+    interpretar_datos_solicitud,
+    ordenar_columnas_tabla,
+    iterar_por_url
+)
+
+logger = logging.getLogger(__name__)
+
+URL_LISTADO_SOLICITUDES = URL_PORTAL + "/workflow/externalizacion-personal"
+
+# Elementos HTML sin etiqueta de cierre; no se apilan al recorrer el documento
+ELEMENTOS_VACIOS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+class SesionHttpInvalidaError(Exception):
+    """La respuesta no corresponde a una página autenticada del portal (sesión expirada o redirección al login)."""
+
+
+def _clases(attrs):
+    return set((dict(attrs).get("class") or "").split())
+
+
+def _normalizar(texto):
+    # Igual que WebElement.text: espacios colapsados y sin bordes
+    return " ".join(texto.split())
+
+
+class ParserDetalle(HTMLParser):
+    """
+    Recorre el HTML del detalle de una solicitud y recoge lo mismo que JS_DATOS_SOLICITUD:
+    etiquetas/valores de 'Datos de la solicitud', data-metakey presentes, botón aceptar y
+    la tabla de 'Aceptación del proveedor'.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.campos = {}
+        self.metakeys = []
+        self.boton_aceptar = False
+        self.tabla = []
+        self.encabezados = []
+        self._pila = []
+        self._en_datos = None        # profundidad del contenedor 'datos_solicitud'
+        self._etiqueta = None        # [texto, profundidad del padre] de la última <strong>
+        self._strong = None          # texto acumulado de la <strong> abierta
+        self._span = None            # [etiqueta, texto, profundidad] del <span> valor abierto
+        self._en_list_group = None   # profundidad del div.list-group-item.text-sm
+        self._tabla_estado = None    # "tabla", "thead", "tbody" mientras se lee la tabla de aceptación
+        self._fila = None
+        self._celda = None
+        self._tabla_leida = False
+
+    def handle_starttag(self, tag, attrs):
+        atributos = dict(attrs)
+        clases = _clases(attrs)
+        profundidad = len(self._pila)
+
+        if tag == "div" and atributos.get("data-metakey"):
+            self.metakeys.append(atributos["data-metakey"])
+        if tag == "div" and self._en_datos is None and "datos_solicitud" in (atributos.get("id") or ""):
+            self._en_datos = profundidad
+        if tag == "div" and self._en_list_group is None and {"list-group-item", "text-sm"} <= clases:
+            self._en_list_group = profundidad
+        if tag == "button" and "btn-outline-success" in clases and \
+                atributos.get("data-target") == "#form-modal-aceptarSolicitudYOT-aceptacion_ot":
+            self.boton_aceptar = True
+
+        if self._en_datos is not None:
+            if tag == "strong":
+                self._strong = ""
+                self._etiqueta = None
+            elif tag == "span" and self._etiqueta and self._etiqueta[1] == profundidad and self._span is None:
+                self._span = [self._etiqueta[0], "", profundidad]
+                self._etiqueta = None
+
+        if self._en_list_group is not None and not self._tabla_leida:
+            if tag == "table" and atributos.get("class") == "table table-bordered":
+                self._tabla_estado = "tabla"
+            elif tag == "thead" and self._tabla_estado == "tabla":
+                self._tabla_estado = "thead"
+            elif tag in ("th", "td") and self._tabla_estado == "thead":
+                self._celda = ""
+            elif tag == "tbody" and self._tabla_estado == "tabla":
+                self._tabla_estado = "tbody"
+            elif tag == "tr" and self._tabla_estado == "tbody":
+                self._fila = []
+            elif tag == "td" and self._fila is not None:
+                self._celda = ""
+
+        if tag not in ELEMENTOS_VACIOS:
+            self._pila.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in ELEMENTOS_VACIOS or tag not in self._pila:
+            return
+        while self._pila:
+            abierto = self._pila.pop()
+            self._cerrar(abierto)
+            if abierto == tag:
+                break
+
+    def _cerrar(self, tag):
+        profundidad = len(self._pila)
+
+        if tag == "strong" and self._strong is not None:
+            self._etiqueta = [_normalizar(self._strong), profundidad]
+            self._strong = None
+        elif tag == "span" and self._span is not None and self._span[2] == profundidad:
+            etiqueta, valor, _ = self._span
+            self.campos.setdefault(etiqueta, _normalizar(valor))
+            self._span = None
+        elif tag in ("th", "td") and self._celda is not None and self._tabla_estado == "thead":
+            self.encabezados.append(_normalizar(self._celda))
+            self._celda = None
+        elif tag == "thead" and self._tabla_estado == "thead":
+            self._tabla_estado = "tabla"
+        elif tag == "td" and self._celda is not None:
+            self._fila.append(_normalizar(self._celda))
+            self._celda = None
+        elif tag == "tr" and self._fila is not None:
+            self.tabla.append(self._fila)
+            self._fila = None
+        elif tag == "table" and self._tabla_estado is not None:
+            self._tabla_estado = None
+            self._tabla_leida = True
+
+        if self._en_datos is not None and profundidad == self._en_datos:
+            self._en_datos = None
+            self._etiqueta = None
+        if self._en_list_group is not None and profundidad == self._en_list_group:
+            self._en_list_group = None
+
+    def handle_data(self, data):
+        if self._strong is not None:
+            self._strong += data
+        if self._span is not None:
+            self._span[1] += data
+        if self._celda is not None:
+            self._celda += data
+
+
+class ParserListado(HTMLParser):
+    """
+    Recoge las filas de una tabla del listado por su id: el número de solicitud (enlace
+    a.btn.btn-sm.text-orange) y el texto de cada columna.
+    """
+
+    def __init__(self, tabla_id):
+        super().__init__()
+        self.tabla_id = tabla_id
+        self.filas = []
+        self._en_tabla = 0
+        self._fila = None
+        self._celda = None
+        self._enlace = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            if self._en_tabla:
+                self._en_tabla += 1
+            elif dict(attrs).get("id") == self.tabla_id:
+                self._en_tabla = 1
+        elif not self._en_tabla:
+            return
+        elif tag == "tr":
+            self._fila = {"numero_solicitud": "", "columnas": []}
+        elif tag == "td" and self._fila is not None:
+            self._celda = ""
+        elif tag == "a" and self._fila is not None and {"btn", "btn-sm", "text-orange"} <= _clases(attrs):
+            self._enlace = ""
+
+    def handle_endtag(self, tag):
+        if not self._en_tabla:
+            return
+        if tag == "table":
+            self._en_tabla -= 1
+        elif tag == "a" and self._enlace is not None:
+            if not self._fila["numero_solicitud"]:
+                self._fila["numero_solicitud"] = _normalizar(self._enlace)
+            self._enlace = None
+        elif tag == "td" and self._celda is not None:
+            self._fila["columnas"].append(_normalizar(self._celda))
+            self._celda = None
+        elif tag == "tr" and self._fila is not None:
+            if self._fila["numero_solicitud"]:
+                self.filas.append(self._fila)
+            self._fila = None
+
+    def handle_data(self, data):
+        if self._enlace is not None:
+            self._enlace += data
+        if self._celda is not None:
+            self._celda += data
+
+
+def crear_sesion_http(driver, tamano_pool=10):
+    """
+    Crea una sesión de requests con las cookies y el User-Agent del navegador ya autenticado.
+
+    :param driver: Instancia de Selenium WebDriver con la sesión iniciada.
+    :param tamano_pool: Número máximo de conexiones reutilizables hacia el portal.
+    :return: requests.Session lista para descargar páginas del portal.
+    """
+    sesion = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=tamano_pool, pool_maxsize=tamano_pool)
+    sesion.mount("https://", adaptador)
+    sesion.mount("http://", adaptador)
+    sesion.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+
+    for cookie in driver.get_cookies():
+        sesion.cookies.set(
+            cookie["name"], cookie["value"],
+            domain=cookie.get("domain"), path=cookie.get("path", "/")
+        )
+    logger.info(f"Sesión HTTP creada con {len(sesion.cookies)} cookies del navegador.")
+    return sesion
+
+
+def _descargar(sesion, url, timeout=30):
+    respuesta = sesion.get(url, timeout=timeout)
+    respuesta.raise_for_status()
+    if "inputUsername_recover" in respuesta.text:
+        raise SesionHttpInvalidaError(f"La sesión HTTP no está autenticada al pedir {url}")
+    return respuesta.text
+
+
+def obtener_listado_http(sesion, tabla_id):
+    """
+    Descarga el listado como HTML y devuelve las filas de la tabla indicada.
+
+    :param sesion: Sesión HTTP autenticada.
+    :param tabla_id: Id de la tabla DataTables (por ejemplo 'table-dt_review').
+    :return: Lista de diccionarios {numero_solicitud, columnas}, vacía si la tabla no trae filas en el HTML.
+    """
+    try:
+        parser = ParserListado(tabla_id)
+        parser.feed(_descargar(sesion, URL_LISTADO_SOLICITUDES))
+        logger.info(f"Listado HTTP: {len(parser.filas)} solicitudes en la tabla '{tabla_id}'.")
+        return parser.filas
+    except Exception as e:
+        logger.error(f"Error descargando el listado por HTTP: {e}")
+        return []
+
+
+def extraer_detalle_http(sesion, numero_solicitud, incluir_tabla=False):
+    """
+    Descarga el detalle de una solicitud como HTML y extrae los mismos datos que ingresar_y_extraer_datos.
+
+    :param sesion: Sesión HTTP autenticada.
+    :param numero_solicitud: Número de la solicitud.
+    :param incluir_tabla: Si es True, agrega 'tabla_aceptacion_proveedor' a los datos.
+    :return: Tuple (datos, secciones).
+    """
+    link = URL_DETALLE_SOLICITUD.format(numero_solicitud)
+    parser = ParserDetalle()
+    parser.feed(_descargar(sesion, link))
+
+    if "datos_solicitud" not in parser.metakeys:
+        raise SesionHttpInvalidaError(f"El detalle de la solicitud {numero_solicitud} no trae 'Datos de la solicitud'")
+
+    campos, secciones = interpretar_datos_solicitud({
+        "campos": parser.campos,
+        "metakeys": parser.metakeys,
+        "boton_aceptar": parser.boton_aceptar
+    })
+    datos = {"numero_solicitud": numero_solicitud, **campos, "link": link}
+    if incluir_tabla:
+        tabla = ordenar_columnas_tabla(parser.encabezados, parser.tabla)
+        datos["tabla_aceptacion_proveedor"] = tabla if secciones["aceptacion_proveedor"] and tabla else None
+    return datos, secciones
+
+
+def _extraer_medido(sesion, numero_solicitud, incluir_tabla):
+    with metricas.solicitud(numero_solicitud):
+        datos, secciones = extraer_detalle_http(sesion, numero_solicitud, incluir_tabla)
+        metricas.anotar_resultado(datos, secciones, motor="http")
+        return datos, secciones
+
+
+def iterar_por_http(sesion, numeros_solicitud, driver, extraer_selenium, incluir_tabla=False, num_hilos=8):
+    """
+    Extrae las solicitudes descargando el HTML en paralelo y entrega cada una apenas termina
+    (en orden de llegada); las que fallen se extraen al final con Selenium.
+
+    :param sesion: Sesión HTTP autenticada (ver crear_sesion_http).
+    :param numeros_solicitud: Lista de números de solicitud en el orden de la tabla.
+    :param driver: Driver autenticado usado como respaldo.
+    :param extraer_selenium: Función (driver, numero_solicitud) -> (datos, secciones) que no cierra la pestaña.
+    :param incluir_tabla: Si es True, incluye la tabla de 'Aceptación del proveedor'.
+    :param num_hilos: Número de descargas concurrentes.
+    :return: Generador de tuplas (datos, secciones).
+    """
+    logger.info(f"Extrayendo {len(numeros_solicitud)} solicitudes por HTTP con {num_hilos} hilos...")
+    total = 0
+    fallidos = []
+
+    with ThreadPoolExecutor(max_workers=num_hilos) as executor:
+        futuros = {
+            executor.submit(_extraer_medido, sesion, numero_solicitud, incluir_tabla): numero_solicitud
+            for numero_solicitud in numeros_solicitud
+        }
+        try:
+            for futuro in as_completed(futuros):
+                numero_solicitud = futuros[futuro]
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    logger.warning(f"Extracción HTTP fallida para la solicitud {numero_solicitud}: {e}")
+                    fallidos.append(numero_solicitud)
+                    continue
+                total += 1
+                yield resultado
+        finally:
+            # Si se deja de consumir antes de tiempo, no se empiezan las descargas pendientes
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    if fallidos:
+        logger.warning(f"{len(fallidos)} solicitudes se extraerán con Selenium como respaldo.")
+        for resultado in iterar_por_url(driver, fallidos, extraer_selenium):
+            total += 1
+            yield resultado
+
+    logger.info(f"Extracción HTTP completa. Total de solicitudes: {total}.")
@@ -0,0 +1,460 @@
+import argparse
+import logging
+import os
+import time
+from contextlib import closing
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from dotenv import load_dotenv
+
+from esperas import presupuesto, medir_fase
+from registro import configurar_registro, detener_registro
+from metricas import metricas
+from eventos import eventos
+from capturas import capturas
+from cache_detalle import cache_detalle
+from planificador import PRESUPUESTO_EXTRACCION_SEGUNDOS, planificar
+from extraccion_detalle import iterar_en_paralelo, iterar_por_url
+from listado import obtener_listado
+from motor_http import crear_sesion_http, obtener_listado_http, iterar_por_http
+from motor_cdp import iterar_por_cdp
+from estado import EstadoSolicitudes, huellas_filas
+from modelo import Solicitud, filas_hoja
+from sheets import SubidorSheets, escribir_diferencias_lote, obtener_servicio
+from punto_control import PuntoControl
+from portal import (
+    PERFIL_NAVEGADOR,
+    patrones_bloqueados,
+    setup_driver,
+    login_sistema_requerimientos,
+    navegar_menu_soporte_operativo,
+    abrir_pestana_listado,
+    extraer_tabla_aceptacion_proveedor,
+    iterar_todas_las_solicitudes,
+    ingresar_y_extraer_datos
+)
+
+logger = logging.getLogger(__name__)
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Número de navegadores en paralelo para extraer el detalle de las solicitudes (1 = secuencial)
+NUM_WORKERS = int(os.getenv("NUM_WORKERS", "1"))
+# "url" (por defecto): navega directo a la URL del detalle;
+# "http": descarga el detalle con requests reutilizando la sesión del navegador;
+# "cdp": abre varias pestañas concurrentes en el mismo navegador con asyncio sobre DevTools;
+# "clic": abre cada solicitud desde la tabla, página a página. Con NUM_WORKERS=1 este modo no usa el
+# estado local ni el planificador (vuelve a abrir todas las solicitudes en el orden de la tabla);
+# los demás modos, y "clic" con NUM_WORKERS > 1, sincronizan solo lo nuevo o cambiado, urgentes primero.
+MODO_EXTRACCION = os.getenv("MODO_EXTRACCION", "url")
+# Descargas concurrentes en el modo "http"
+NUM_HILOS_HTTP = int(os.getenv("NUM_HILOS_HTTP", "8"))
+# Pestañas concurrentes en el modo "cdp"
+NUM_PESTANAS = int(os.getenv("NUM_PESTANAS", "4"))
+# Estado local de la sincronización incremental y antigüedad máxima antes de volver a extraer
+ESTADO_DB = os.getenv("ESTADO_DB", "estado_solicitudes.sqlite")
+ESTADO_MAX_HORAS = float(os.getenv("ESTADO_MAX_HORAS", "24"))
+SPREADSHEET_ID = "1bGo4MAwjZwVhQmzTjksRoHV6UuaPaYa-UVYB21vL_Ls" ## Requerimientos
+# Subida parcial a Sheets durante la extracción: cada cuántas filas o segundos (0 filas = desactivada)
+SUBIDA_CADA_FILAS = int(os.getenv("SUBIDA_CADA_FILAS", "50"))
+SUBIDA_CADA_SEGUNDOS = float(os.getenv("SUBIDA_CADA_SEGUNDOS", "30"))
+# Punto de control por solicitud para reanudar con --resume, y antigüedad máxima de lo que se reutiliza
+PUNTO_CONTROL = os.getenv("PUNTO_CONTROL", "punto_control.jsonl")
+PUNTO_CONTROL_VENTANA_HORAS = float(os.getenv("PUNTO_CONTROL_VENTANA_HORAS", "6"))
+# Resumen de tiempos de la ejecución (p50/p95/p99, solicitudes más lentas) y detalle por solicitud
+METRICAS_JSON = os.getenv("METRICAS_JSON", "metricas_ejecucion.json")
+METRICAS_CSV = os.getenv("METRICAS_CSV", "metricas_solicitudes.csv")
+# Flujo de eventos JSONL (uno por solicitud, página y llamada a Sheets); se anexa en cada ejecución
+EVENTOS_JSONL = os.getenv("EVENTOS_JSONL", "eventos_ejecucion.jsonl")
+# Caché del detalle de las solicitudes que ya no cambian (ver cache_detalle.CACHE_TTL_HORAS)
+CACHE_DETALLE_DB = os.getenv("CACHE_DETALLE_DB", "cache_detalle.sqlite")
+
+# Tablas del listado que se sincronizan, cada una con su hoja:
+#   tab_id: pestaña a abrir antes de leer la tabla (None si es la visible al entrar)
+#   tabla_id / boton_siguiente_id: ids de la tabla DataTables y de su botón 'Siguiente'
+#   rango: rango de datos (sin encabezados) en la hoja de cálculo
+#   extractores: datos adicionales del detalle, clave -> (sección requerida, función(driver))
+#   expandir_tabla: si es True, se escribe una fila por cada fila de 'tabla_aceptacion_proveedor'
+OBJETIVOS = {
+    "principal": {
+        "tab_id": None,
+        "tabla_id": "table-dt_review",
+        "boton_siguiente_id": "table-dt_review_next",
+        "rango": "Principal!A3:Q",
+        "extractores": {},
+        "expandir_tabla": False
+    },
+    "en_proceso": {
+        "tab_id": "tabs-icons-text-2-tab",
+        "tabla_id": "table-dt_process",
+        "boton_siguiente_id": "table-dt_process_next",
+        "rango": "En Proceso!A3:X",
+        "extractores": {
+            "tabla_aceptacion_proveedor": ("aceptacion_proveedor", extraer_tabla_aceptacion_proveedor)
+        },
+        "expandir_tabla": True
+    }
+}
+
+
+def leer_listados(driver, nombres):
+    """
+    Lee las filas de todas las tablas indicadas con la sesión ya iniciada.
+
+    En el modo "http" se descarga el listado con requests; las tablas que no traigan filas en el HTML
+    se leen con el navegador, navegando al menú una sola vez y cambiando de pestaña para cada tabla.
+
+    :param driver: Instancia de Selenium WebDriver con la sesión iniciada.
+    :param nombres: Nombres de los objetivos (claves de OBJETIVOS).
+    :return: Tuple (filas por objetivo, sesión HTTP o None).
+    """
+    sesion = None
+    filas_por_objetivo = {}
+    if MODO_EXTRACCION == "http":
+        sesion = crear_sesion_http(driver, tamano_pool=NUM_HILOS_HTTP)
+        for nombre in nombres:
+            filas = obtener_listado_http(sesion, OBJETIVOS[nombre]["tabla_id"])
+            if filas:
+                filas_por_objetivo[nombre] = filas
+            else:
+                logger.warning(f"El listado HTTP no trajo solicitudes para '{nombre}'. Leyendo la tabla con el navegador.")
+
+    faltantes = [nombre for nombre in nombres if nombre not in filas_por_objetivo]
+    if faltantes:
+        navegar_menu_soporte_operativo(driver)
+        for nombre in faltantes:
+            objetivo = OBJETIVOS[nombre]
+            if objetivo["tab_id"]:
+                abrir_pestana_listado(driver, objetivo["tab_id"])
+            filas_por_objetivo[nombre] = obtener_listado(
+                driver, objetivo["tabla_id"], objetivo["boton_siguiente_id"]
+            )
+
+    return filas_por_objetivo, sesion
+
+
+def iterar_solicitudes(driver, sesion, numeros_solicitud, extractores_por_numero):
+    """
+    Extrae el detalle de las solicitudes de todos los objetivos en una sola pasada y entrega
+    cada una apenas se extrae. Las que están vigentes en el caché de detalle se entregan primero
+    sin abrirlas, y las recién extraídas se guardan en él.
+
+    :param driver: Instancia de Selenium WebDriver con la sesión iniciada.
+    :param sesion: Sesión HTTP autenticada o None si no se usa el modo "http".
+    :param numeros_solicitud: Números a extraer, sin repetir.
+    :param extractores_por_numero: Extractores adicionales de cada número (unión de los de sus objetivos).
+    :return: Generador de tuplas (datos, secciones).
+    """
+    # Las solicitudes cuyo detalle ya no cambia se toman del caché sin abrirlas
+    en_cache = cache_detalle.consultar(numeros_solicitud, extractores_por_numero)
+    yield from en_cache.values()
+    numeros_solicitud = [numero for numero in numeros_solicitud if numero not in en_cache]
+    with closing(_extraer_solicitudes(driver, sesion, numeros_solicitud, extractores_por_numero)) as extraccion:
+        for datos, secciones in extraccion:
+            cache_detalle.guardar(datos, secciones)
+            yield datos, secciones
+
+
+def _extraer_solicitudes(driver, sesion, numeros_solicitud, extractores_por_numero):
+    def extraer(driver, numero_solicitud):
+        return ingresar_y_extraer_datos(
+            driver, numero_solicitud, cerrar_pestana=False,
+            extractores=extractores_por_numero.get(numero_solicitud)
+        )
+
+    if not numeros_solicitud:
+        return iter(())
+    incluir_tabla = any(extractores_por_numero.get(numero) for numero in numeros_solicitud)
+    if MODO_EXTRACCION == "cdp":
+        return iterar_por_cdp(
+            driver, numeros_solicitud, extraer, incluir_tabla=incluir_tabla, num_pestanas=NUM_PESTANAS,
+            urls_bloqueadas=patrones_bloqueados() if PERFIL_NAVEGADOR == "ligero" else None
+        )
+    if sesion is not None:
+        return iterar_por_http(
+            sesion, numeros_solicitud, driver, extraer,
+            incluir_tabla=incluir_tabla, num_hilos=NUM_HILOS_HTTP
+        )
+    if NUM_WORKERS > 1:
+        return iterar_en_paralelo(
+            numeros_solicitud, setup_driver, login_sistema_requerimientos, extraer,
+            NUM_WORKERS, driver_principal=driver
+        )
+    return iterar_por_url(driver, numeros_solicitud, extraer)
+
+
+def sincronizar_objetivos(driver, nombres, subidor=None, punto_control=None):
+    """
+    Lee los listados y extrae solo las solicitudes nuevas o cuya fila cambió desde la última ejecución.
+
+    Las solicitudes pendientes de todos los objetivos, más las urgentes aunque su fila no haya
+    cambiado, se extraen juntas (ver iterar_solicitudes), primero las urgentes y las nuevas (ver
+    planificador.planificar); las demás se toman del estado local de cada objetivo. Cada solicitud extraída se guarda en el
+    estado y se entrega al subidor en cuanto llega, así que un fallo tardío no pierde lo ya extraído.
+    Al reanudar, las solicitudes del plan que ya están en el punto de control no se vuelven a abrir.
+
+    :param driver: Instancia de Selenium WebDriver con la sesión iniciada.
+    :param nombres: Nombres de los objetivos (claves de OBJETIVOS).
+    :param subidor: SubidorSheets que sube las filas mientras la extracción continúa (opcional).
+    :param punto_control: PuntoControl donde se anota cada solicitud extraída (opcional).
+    :return: Diccionario nombre -> lista de Solicitud de todo su listado, en orden.
+    """
+    filas_por_objetivo, sesion = leer_listados(driver, nombres)
+
+    estados = {nombre: EstadoSolicitudes(ESTADO_DB, nombre) for nombre in nombres}
+    # Huellas de las filas calculadas una sola vez por objetivo (se usan en cada guardado)
+    huellas = {nombre: huellas_filas(filas_por_objetivo[nombre]) for nombre in nombres}
+    try:
+        pendientes = {
+            nombre: set(estados[nombre].pendientes(
+                filas_por_objetivo[nombre], max_edad_horas=ESTADO_MAX_HORAS, huellas=huellas[nombre]
+            ))
+            for nombre in nombres
+        }
+
+        # Qué extraer y en qué orden sale del listado y del estado juntos: las pendientes y además las
+        # urgentes según lo último extraído aunque su fila no haya cambiado
+        anteriores = {
+            solicitud.numero_solicitud: solicitud
+            for nombre in nombres for solicitud in estados[nombre].resultados(filas_por_objetivo[nombre])
+        }
+        plan = planificar(
+            [fila for nombre in nombres for fila in filas_por_objetivo[nombre]],
+            anteriores, set().union(*pendientes.values())
+        )
+        en_plan = set(plan)
+        extractores_por_numero = {numero: {} for numero in plan}
+        for nombre in nombres:
+            for fila in filas_por_objetivo[nombre]:
+                if fila["numero_solicitud"] in en_plan:
+                    pendientes[nombre].add(fila["numero_solicitud"])
+                    extractores_por_numero[fila["numero_solicitud"]].update(OBJETIVOS[nombre]["extractores"])
+
+        # Al reanudar, las solicitudes ya anotadas en el punto de control no se vuelven a abrir: se
+        # guardan en el estado y se entregan al subidor como si se acabaran de extraer
+        reutilizadas = set()
+        if punto_control is not None:
+            faltantes = set()
+            for nombre in nombres:
+                completadas = punto_control.completadas(nombre)
+                for numero in pendientes[nombre] & en_plan:
+                    solicitud = completadas.get(numero)
+                    if solicitud is None:
+                        faltantes.add(numero)
+                        continue
+                    estados[nombre].guardar(huellas[nombre], [solicitud])
+                    _entregar(subidor, None, nombre, solicitud)
+                    reutilizadas.add((nombre, numero))
+            if len(faltantes) < len(plan):
+                logger.info(f"Reanudando: {len(plan) - len(faltantes)} solicitudes tomadas del punto de control.")
+                plan = [numero for numero in plan if numero in faltantes]
+
+        # Una sola pasada por el motor (un solo arranque del pool) mientras quede presupuesto de tiempo;
+        # al cerrar el generador antes de tiempo, el motor no empieza más solicitudes
+        inicio = time.perf_counter()
+        extraidas = 0
+        with closing(iterar_solicitudes(driver, sesion, plan, extractores_por_numero)) as extraccion:
+            for datos, secciones in extraccion:
+                solicitud = Solicitud.desde_extraccion(datos, secciones)
+                extraidas += 1
+                for nombre in nombres:
+                    if solicitud.numero_solicitud in pendientes[nombre] and \
+                            (nombre, solicitud.numero_solicitud) not in reutilizadas:
+                        estados[nombre].guardar(huellas[nombre], [solicitud])
+                        _entregar(subidor, punto_control, nombre, solicitud)
+                if PRESUPUESTO_EXTRACCION_SEGUNDOS and \
+                        time.perf_counter() - inicio >= PRESUPUESTO_EXTRACCION_SEGUNDOS:
+                    logger.warning(
+                        f"Presupuesto de extracción agotado ({PRESUPUESTO_EXTRACCION_SEGUNDOS:g}s): "
+                        f"{len(plan) - extraidas} solicitudes quedan pendientes para la próxima ejecución."
+                    )
+                    break
+
+        resultados = {}
+        for nombre in nombres:
+            filas = filas_por_objetivo[nombre]
+            estados[nombre].purgar(filas)
+            resultados[nombre] = estados[nombre].resultados(filas)
+        return resultados
+    finally:
+        for estado in estados.values():
+            estado.cerrar()
+
+
+def extraer_con_clics(driver, nombres, subidor=None, punto_control=None):
+    """
+    Recorre cada tabla página a página abriendo cada solicitud con un clic (modo "clic" sin pool).
+
+    Las solicitudes que ya están en el punto de control (al reanudar) no se vuelven a abrir.
+
+    :param driver: Instancia de Selenium WebDriver con la sesión iniciada.
+    :param nombres: Nombres de los objetivos (claves de OBJETIVOS).
+    :param subidor: SubidorSheets que sube las filas mientras la extracción continúa (opcional).
+    :param punto_control: PuntoControl donde se anota cada solicitud extraída (opcional).
+    :return: Diccionario nombre -> lista de Solicitud.
+    """
+    navegar_menu_soporte_operativo(driver)
+    resultados = {}
+    for nombre in nombres:
+        objetivo = OBJETIVOS[nombre]
+        if objetivo["tab_id"]:
+            abrir_pestana_listado(driver, objetivo["tab_id"])
+        resultados[nombre] = []
+        with presupuesto.fase("listado"):
+            completadas = {
+                numero: solicitud.como_extraccion()
+                for numero, solicitud in (punto_control.completadas(nombre) if punto_control is not None else {}).items()
+            }
+            for datos, secciones in iterar_todas_las_solicitudes(
+                driver, objetivo["boton_siguiente_id"], extractores=objetivo["extractores"],
+                completadas=completadas
+            ):
+                solicitud = Solicitud.desde_extraccion(datos, secciones)
+                resultados[nombre].append(solicitud)
+                if solicitud.numero_solicitud not in completadas:
+                    _entregar(subidor, punto_control, nombre, solicitud)
+    return resultados
+
+
+def _entregar(subidor, punto_control, nombre, solicitud):
+    if punto_control is not None:
+        punto_control.registrar(nombre, solicitud)
+    if subidor is not None:
+        objetivo = OBJETIVOS[nombre]
+        subidor.agregar(objetivo["rango"], filas_hoja([solicitud], objetivo["expandir_tabla"]))
+
+
+@medir_fase("sheets")
+def actualizar_google_sheets_batch(solicitudes_por_objetivo, intentos=3, delay=5):
+    """
+    Sincroniza las hojas de todos los objetivos escribiendo solo las filas que cambiaron.
+
+    Lee todas las hojas con un único batchGet y aplica inserciones, actualizaciones y eliminaciones
+    en un único batchUpdate, sin limpiar antes los rangos.
+
+    :param solicitudes_por_objetivo: Diccionario nombre -> lista de Solicitud.
+    :param intentos: Número máximo de intentos ante errores transitorios.
+    :param delay: Base del backoff exponencial entre intentos en segundos.
+    """
+    try:
+        filas_por_rango = {}
+        for nombre, solicitudes in solicitudes_por_objetivo.items():
+            if not solicitudes:
+                logger.error(f"No hay datos de '{nombre}' para actualizar en Google Sheets.")
+                continue
+            objetivo = OBJETIVOS[nombre]
+            filas_por_rango[objetivo["rango"]] = filas_hoja(solicitudes, objetivo["expandir_tabla"])
+
+        if not filas_por_rango:
+            return
+
+        # Cliente de Sheets compartido (credenciales y token reutilizados)
+        service = obtener_servicio("sheets", "v4")
+
+        # Aplicar solo las diferencias respecto de lo que ya está en las hojas
+        escribir_diferencias_lote(service, SPREADSHEET_ID, filas_por_rango, intentos=intentos, delay=delay)
+
+    except Exception as e:
+        logger.error(f"Error subiendo datos a Google Sheets: {e}")
+        raise
+
+
+def reportar_recursos(inicio):
+    """
+    Registra el tiempo total y el uso de CPU y memoria de la ejecución, del proceso y de sus hijos
+    (chromedriver y Chrome, ya terminados tras driver.quit()).
+
+    :param inicio: Valor de time.perf_counter() al comenzar la ejecución.
+    """
+    duracion = time.perf_counter() - inicio
+    if resource is None:
+        logger.info(f"Recursos de la ejecución: {duracion:.1f}s totales.")
+        return
+    propio = resource.getrusage(resource.RUSAGE_SELF)
+    hijos = resource.getrusage(resource.RUSAGE_CHILDREN)
+    logger.info(
+        f"Recursos de la ejecución ({PERFIL_NAVEGADOR}): {duracion:.1f}s totales; "
+        f"CPU Python {propio.ru_utime + propio.ru_stime:.1f}s, memoria máx. {propio.ru_maxrss / 1024:.0f} MB; "
+        f"CPU navegadores {hijos.ru_utime + hijos.ru_stime:.1f}s, memoria máx. de un proceso {hijos.ru_maxrss / 1024:.0f} MB."
+    )
+
+
+def main(argv=None, nombre_log="pipeline"):
+    """
+    Inicia sesión una sola vez, extrae las solicitudes de los objetivos indicados y actualiza sus hojas.
+
+    :param argv: Argumentos de línea de comandos (por defecto sys.argv): objetivos a sincronizar
+                 (claves de OBJETIVOS; sin objetivos se sincronizan todos) y --resume para reanudar
+                 desde el punto de control de una ejecución interrumpida.
+    :param nombre_log: Nombre del archivo de log de la ejecución ('<nombre_log>.log').
+    """
+    parser = argparse.ArgumentParser(description="Sincroniza las tablas del portal con Google Sheets.")
+    parser.add_argument("objetivos", nargs="*", metavar="objetivo",
+                        help=f"Tablas a sincronizar ({', '.join(OBJETIVOS)}); por defecto todas.")
+    parser.add_argument("--resume", dest="reanudar", action="store_true",
+                        help="Omite las solicitudes ya extraídas en el punto de control de la ejecución anterior.")
+    argumentos = parser.parse_args(argv)
+    desconocidos = [nombre for nombre in argumentos.objetivos if nombre not in OBJETIVOS]
+    if desconocidos:
+        parser.error(f"Objetivos desconocidos: {', '.join(desconocidos)}")
+    nombres = argumentos.objetivos or list(OBJETIVOS)
+
+    configurar_registro(nombre_log)
+    eventos.abrir(EVENTOS_JSONL, bot=nombre_log, objetivos=nombres, modo=MODO_EXTRACCION, workers=NUM_WORKERS)
+    cache_detalle.abrir(CACHE_DETALLE_DB)
+    inicio = time.perf_counter()
+    exito = False
+    driver = setup_driver()
+    try:
+        # Paso 1: Iniciar sesión (una sola vez para todas las tablas)
+        login_sistema_requerimientos(driver)
+
+        # Paso 2 y 3: Navegar y extraer todas las solicitudes sin límite, subiendo a Sheets por tandas
+        subidor = SubidorSheets(SPREADSHEET_ID, SUBIDA_CADA_FILAS, SUBIDA_CADA_SEGUNDOS) if SUBIDA_CADA_FILAS > 0 else None
+        punto_control = PuntoControl(PUNTO_CONTROL, argumentos.reanudar, PUNTO_CONTROL_VENTANA_HORAS)
+        try:
+            if MODO_EXTRACCION == "clic" and NUM_WORKERS <= 1:
+                solicitudes_por_objetivo = extraer_con_clics(driver, nombres, subidor, punto_control)
+            else:
+                solicitudes_por_objetivo = sincronizar_objetivos(driver, nombres, subidor, punto_control)
+        except Exception:
+            # Subir lo extraído hasta el fallo antes de terminar; el punto de control se conserva
+            if subidor is not None:
+                subidor.cerrar()
+            punto_control.cerrar()
+            raise
+        if subidor is not None:
+            subidor.cerrar(vaciar=False)
+            logger.info(f"Filas subidas a Google Sheets durante la extracción: {subidor.filas_subidas}.")
+
+        # Paso 4: Sincronizar todas las hojas (incluidas las eliminaciones) en una sola escritura
+        actualizar_google_sheets_batch(solicitudes_por_objetivo)
+        punto_control.cerrar(completado=True)
+        exito = True
+
+    except Exception as e:
+        logger.error(f"Proceso terminado con errores: {e}")
+    finally:
+        try:
+            driver.quit()
+            logger.info("Driver cerrado.")
+        except Exception as e:
+            logger.error(f"Error al cerrar el driver: {e}")
+        presupuesto.reportar()
+        reportar_recursos(inicio)
+        metricas.escribir(METRICAS_JSON, METRICAS_CSV)
+        capturas.cerrar()
+        cache_detalle.cerrar()
+        eventos.cerrar(
+            duracion=round(time.perf_counter() - inicio, 3), resultado="ok" if exito else "error",
+            solicitudes=metricas.resumen(mas_lentas=0)["solicitudes"]["n"]
+        )
+        detener_registro()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import logging
+import os
+import re
+from datetime import date, timedelta
+
+from modelo import Seccion
+
+logger = logging.getLogger(__name__)
+
+# Días antes (y después) de la fecha de inicio en que una solicitud se considera urgente
+PRIORIDAD_DIAS_INICIO = float(os.getenv("PRIORIDAD_DIAS_INICIO", "3"))
+PRIORIDAD_DIAS_DESPUES_INICIO = float(os.getenv("PRIORIDAD_DIAS_DESPUES_INICIO", "1"))
+# Índices (desde 0, separados por coma) de las columnas del listado con la fecha de inicio o el plazo de
+# la solicitud; vacío = solo se usa la fecha de inicio de la última extracción. Las demás fechas del
+# listado (creación, última modificación...) no cuentan.
+COLUMNAS_FECHA_LISTADO = [
+    int(indice) for indice in os.getenv("COLUMNAS_FECHA_LISTADO", "").split(",") if indice.strip()
+]
+# Si es "1", las solicitudes terminadas (cierre automático o reasignadas) no se vuelven a extraer
+OMITIR_TERMINADAS = os.getenv("OMITIR_TERMINADAS", "0") == "1"
+# Segundos de extracción tras los cuales no se extraen más solicitudes (se revisa tras cada una; como
+# las urgentes y las nuevas van primero, son las últimas en quedar fuera); las no extraídas quedan
+# pendientes para la próxima ejecución. 0 = sin límite
+PRESUPUESTO_EXTRACCION_SEGUNDOS = float(os.getenv("PRESUPUESTO_EXTRACCION_SEGUNDOS", "0"))
+
+# Prioridades, de la más a la menos urgente
+URGENTE = 0     # Con el botón 'Aceptar' pendiente o cerca de su fecha de inicio
+NUEVA = 1       # Nunca extraída
+NORMAL = 2
+TERMINADA = 3   # Con cierre automático o reasignada: su detalle ya no cambia
+
+NOMBRES_PRIORIDAD = {URGENTE: "urgentes", NUEVA: "nuevas", NORMAL: "normales", TERMINADA: "terminadas"}
+
+_PATRON_FECHA = re.compile(r"\b(?:(\d{4})-(\d{1,2})-(\d{1,2})|(\d{1,2})[/-](\d{1,2})[/-](\d{4}))\b")
+
+
+def leer_fechas(texto):
+    """
+    Busca fechas en un texto (aaaa-mm-dd, dd-mm-aaaa o dd/mm/aaaa).
+
+    :param texto: Texto de una celda o de un campo.
+    :return: Lista de date encontradas (se ignoran las inválidas).
+    """
+    fechas = []
+    for anio, mes, dia, dia2, mes2, anio2 in _PATRON_FECHA.findall(texto or ""):
+        try:
+            fechas.append(date(int(anio), int(mes), int(dia)) if anio else date(int(anio2), int(mes2), int(dia2)))
+        except ValueError:
+            continue
+    return fechas
+
+
+def prioridad(fila, anterior=None, hoy=None):
+    """
+    Calcula la prioridad de una solicitud a partir de su fila del listado y de lo último extraído.
+    Solo cuentan las fechas de inicio o plazo, no las de creación o modificación.
+
+    :param fila: Fila del listado ({numero_solicitud, columnas}).
+    :param anterior: Última Solicitud extraída con ese número o None si nunca se extrajo.
+    :param hoy: Fecha de referencia (por defecto, hoy).
+    :return: URGENTE, NUEVA, NORMAL o TERMINADA.
+    """
+    if anterior is not None:
+        if anterior.tiene(Seccion.CIERRE_AUTOMATICO) or anterior.tiene(Seccion.REASIGNACION_SOLICITUDES):
+            return TERMINADA
+        if anterior.tiene(Seccion.BOTON_ACEPTAR):
+            return URGENTE
+
+    # Fecha de inicio conocida y columnas de fecha de inicio o plazo del listado (COLUMNAS_FECHA_LISTADO)
+    hoy = hoy or date.today()
+    desde = hoy - timedelta(days=PRIORIDAD_DIAS_DESPUES_INICIO)
+    hasta = hoy + timedelta(days=PRIORIDAD_DIAS_INICIO)
+    fechas = leer_fechas(anterior.fecha_inicio) if anterior is not None else []
+    columnas = fila.get("columnas") or []
+    for indice in COLUMNAS_FECHA_LISTADO:
+        if indice < len(columnas):
+            fechas.extend(leer_fechas(columnas[indice]))
+    if any(desde <= fecha <= hasta for fecha in fechas):
+        return URGENTE
+
+    return NUEVA if anterior is None else NORMAL
+
+
+def planificar(filas, anteriores, pendientes):
+    """
+    Decide qué solicitudes extraer y en qué orden, a partir del listado y del estado local.
+
+    Se extraen las pendientes (nuevas o cuya fila cambió) y también las urgentes según lo último
+    extraído aunque su fila no haya cambiado (por ejemplo, con el botón 'Aceptar' pendiente).
+
+    :param filas: Filas del listado ({numero_solicitud, columnas}) de todos los objetivos, en orden.
+    :param anteriores: Diccionario número -> última Solicitud extraída.
+    :param pendientes: Números nuevos o cuya fila cambió desde la última extracción.
+    :return: Lista de números a extraer: urgentes, nuevas, normales y terminadas (estas no se incluyen
+             con OMITIR_TERMINADAS), en el orden del listado dentro de cada prioridad.
+    """
+    tandas = {URGENTE: [], NUEVA: [], NORMAL: [], TERMINADA: []}
+    vistos = set()
+    sin_cambios = 0
+    for fila in filas:
+        numero = fila["numero_solicitud"]
+        if numero in vistos:
+            continue
+        vistos.add(numero)
+        valor = prioridad(fila, anteriores.get(numero))
+        if numero in pendientes or valor == URGENTE:
+            sin_cambios += numero not in pendientes
+            tandas[valor].append(numero)
+
+    logger.info(
+        "Planificación de la extracción: " +
+        ", ".join(f"{len(tandas[valor])} {nombre}" for valor, nombre in NOMBRES_PRIORIDAD.items()) +
+        f" ({sin_cambios} urgentes con la fila sin cambios)" +
+        ("; las terminadas se omiten." if OMITIR_TERMINADAS else ".")
+    )
+    if OMITIR_TERMINADAS:
+        tandas[TERMINADA] = []
+    return [numero for numeros in tandas.values() for numero in numeros]
@@ -0,0 +1,645 @@
+import logging
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import (
+    TimeoutException,
+    NoSuchElementException,
+    StaleElementReferenceException
+)
+
+from esperas import (
+    presupuesto,
+    medir_fase,
+    esperar,
+    esperar_sesion_iniciada,
+    esperar_tabla_dibujada,
+    esperar_cambio_pagina,
+    esperar_colapso_renderizado
+)
+from metricas import metricas
+from capturas import capturas
+from cache_detalle import cache_detalle
+from reintentos import politica_reintentos, tiempos
+from extraccion_detalle import (
+    URL_PORTAL,
+    URL_DETALLE_SOLICITUD,
+    ETIQUETAS_DATOS,
+    CAMPOS_OPCIONALES,
+    XPATH_CAMPO_DATOS,
+    JS_TABLA_PROVEEDOR,
+    extraer_datos_en_lote,
+    ordenar_columnas_tabla
+)
+
+logger = logging.getLogger(__name__)
+
+# Cargar variables de entorno
+load_dotenv()
+
+USER = os.getenv("PORTAL_USER")
+PASSWORD = os.getenv("PORTAL_PASSWORD")
+
+# "ligero": carga 'eager', sin imágenes/fuentes/multimedia/analítica y con perfil persistente; "completo": sin cambios
+PERFIL_NAVEGADOR = os.getenv("PERFIL_NAVEGADOR", "ligero")
+# Directorio base de los user-data-dir reutilizados entre ejecuciones (vacío = perfil temporal)
+DIRECTORIO_PERFIL = os.getenv("DIRECTORIO_PERFIL", ".perfil_chrome")
+# Bloquear también las hojas de estilo (las esperas de colapsos y visibilidad dependen del CSS)
+BLOQUEAR_CSS = os.getenv("BLOQUEAR_CSS", "0") == "1"
+PATRONES_BLOQUEADOS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav"
+]
+HOSTS_BLOQUEADOS = [
+    host.strip() for host in os.getenv(
+        "HOSTS_BLOQUEADOS",
+        "google-analytics.com,googletagmanager.com,doubleclick.net,facebook.net,hotjar.com,clarity.ms"
+    ).split(",") if host.strip()
+]
+# Espera de la tabla de 'Aceptación del proveedor': mínimo del timeout aprendido y timeout del
+# reintento, en segundos (la tabla es obligatoria, así que no se acorta tanto como las demás esperas)
+TIMEOUT_TABLA_PROVEEDOR_MINIMO = float(os.getenv("TIMEOUT_TABLA_PROVEEDOR_MINIMO", "10"))
+TIMEOUT_TABLA_PROVEEDOR = float(os.getenv("TIMEOUT_TABLA_PROVEEDOR", "30"))
+# Menú 'Soporte operativo', solo presente con la sesión iniciada
+XPATH_MENU_SOPORTE = "//a[contains(@class,'dropdown-toggle') and contains(text(),'Soporte operativo')]"
+
+_lock_perfiles = threading.Lock()
+_perfiles_creados = 0
+
+def _siguiente_directorio_perfil():
+    global _perfiles_creados
+    with _lock_perfiles:
+        indice = _perfiles_creados
+        _perfiles_creados += 1
+    # Chrome bloquea el user-data-dir en uso, así que cada navegador del proceso tiene el suyo;
+    # el navegador N de cada ejecución reutiliza siempre el mismo directorio (y su caché).
+    return os.path.abspath(os.path.join(DIRECTORIO_PERFIL, f"navegador-{indice}"))
+
+
+def patrones_bloqueados():
+    """
+    Devuelve los patrones de URL que el perfil ligero no descarga (para Network.setBlockedURLs).
+    """
+    patrones = list(PATRONES_BLOQUEADOS) + [f"*{host}*" for host in HOSTS_BLOQUEADOS]
+    if BLOQUEAR_CSS:
+        patrones.append("*.css")
+    return patrones
+
+
+def _aplicar_bloqueos(driver):
+    """
+    Bloquea por CDP las peticiones a imágenes, fuentes, multimedia y hosts de terceros.
+    """
+    patrones = patrones_bloqueados()
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patrones})
+        logger.debug(f"Bloqueo de recursos activo ({len(patrones)} patrones).")
+    except Exception as e:
+        logger.warning(f"No se pudo activar el bloqueo de recursos por CDP: {e}")
+
+
+def setup_driver():
+    """
+    Crea el navegador Chrome headless.
+
+    Con PERFIL_NAVEGADOR="ligero" (por defecto) usa la estrategia de carga 'eager', no descarga
+    imágenes, fuentes, multimedia ni analítica de terceros y reutiliza entre ejecuciones un
+    user-data-dir persistente (DIRECTORIO_PERFIL) para aprovechar la caché HTTP del navegador.
+    Con "completo" se comporta como el navegador original.
+    """
+    options = Options()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--headless")  # Para ejecución en entornos sin GUI
+    options.add_argument("--window-size=1920,1080")
+
+    ligero = PERFIL_NAVEGADOR == "ligero"
+    if ligero:
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--mute-audio")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2
+        })
+        if DIRECTORIO_PERFIL:
+            options.add_argument(f"--user-data-dir={_siguiente_directorio_perfil()}")
+
+    service = Service("/usr/local/bin/chromedriver")
+    driver = webdriver.Chrome(service=service, options=options)
+    if ligero:
+        _aplicar_bloqueos(driver)
+    return driver
+
+@medir_fase("login")
+def login_sistema_requerimientos(driver):
+    try:
+        logger.info("Navegando al portal de sistema de requerimientos.")
+        driver.get(URL_PORTAL + "/")
+
+        # El perfil persistente del navegador puede conservar una sesión válida de la ejecución anterior:
+        # en ese caso el portal redirige a la página de inicio y no hay formulario de login
+        pagina = WebDriverWait(driver, 20).until(
+            lambda d: ("login" if d.find_elements(By.ID, "tabs-icons-text-2-tab") else None) or
+                      ("sesion" if d.find_elements(By.XPATH, XPATH_MENU_SOPORTE) else None)
+        )
+        if pagina == "sesion":
+            logger.info("Sesión del perfil del navegador aún válida. Se omite el inicio de sesión.")
+            return
+
+        logger.info("Intentando hacer clic en 'Soy Proveedor'...")
+        WebDriverWait(driver, 20).until(
+            EC.element_to_be_clickable((By.ID, "tabs-icons-text-2-tab"))
+        ).click()
+        logger.info("Clic en 'Soy Proveedor' realizado.")
+
+        logger.info("Ingresando credenciales...")
+        WebDriverWait(driver, 20).until(
+            EC.visibility_of_element_located((By.ID, "inputUsername_recover"))
+        ).send_keys(USER)
+        driver.find_element(By.ID, "inputPassword_recover").send_keys(PASSWORD)
+
+        logger.info("Intentando hacer clic en 'Iniciar Sesión'...")
+        boton_login = WebDriverWait(driver, 20).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "div#tabs-icons-text-2 form button[type='submit']"))
+        )
+        boton_login.click()
+        esperar_sesion_iniciada(driver, boton_login)
+        logger.info("Inicio de sesión realizado.")
+
+    except Exception as e:
+        logger.error(f"Error durante el inicio de sesión: {e}")
+        raise
+
+def extraer_texto_con_reintentos(driver, xpath, default="N/A", intentos=3, delay=2, opcional=False):
+    """
+    Extrae el texto de un elemento por XPath con la política de reintentos compartida
+    (backoff exponencial con jitter y timeout aprendido para ese XPath).
+
+    :param driver: Instancia de Selenium WebDriver.
+    :param xpath: Selector XPath del elemento.
+    :param default: Valor por defecto si el elemento no se encuentra.
+    :param intentos: Número máximo de intentos.
+    :param delay: Base del backoff entre intentos en segundos.
+    :param opcional: Si es True, el elemento se busca una sola vez sin esperar (el colapso ya está
+                     abierto) y se devuelve el valor por defecto de inmediato si no está.
+    :return: Texto extraído o el valor predeterminado.
+    """
+    if opcional:
+        try:
+            elementos = driver.find_elements(By.XPATH, xpath)
+            if not elementos:
+                logger.info(f"Campo opcional ausente para XPath: {xpath}.")
+                return default
+            return elementos[0].text.strip()
+        except StaleElementReferenceException:
+            logger.warning(f"Elemento obsoleto al leer el campo opcional: {xpath}. Reintentando con espera.")
+
+    def intentar():
+        inicio = time.perf_counter()
+        elemento = esperar(driver, EC.presence_of_element_located((By.XPATH, xpath)), tiempos.timeout(xpath))
+        tiempos.observar(xpath, time.perf_counter() - inicio)
+        texto = elemento.text.strip()
+        if texto == default:
+            logger.debug(f"Elemento encontrado para XPath: {xpath}. HTML: {elemento.get_attribute('outerHTML')}")
+        return texto
+
+    try:
+        return politica_reintentos(
+            "campo", intentos, delay, (TimeoutException, StaleElementReferenceException)
+        )(intentar)
+    except (TimeoutException, StaleElementReferenceException):
+        logger.error(f"No se pudo extraer el texto para XPath: {xpath} después de {intentos} intentos.")
+        return default
+
+@medir_fase("navegacion")
+def navegar_menu_soporte_operativo(driver):
+    try:
+        logger.info("Intentando hacer clic en 'Soporte operativo'...")
+        WebDriverWait(driver, 20).until(
+            EC.element_to_be_clickable((By.XPATH, XPATH_MENU_SOPORTE))
+        ).click()
+        logger.info("Clic en 'Soporte operativo' realizado.")
+
+        logger.info("Intentando hacer clic en 'Personal Externo'...")
+        WebDriverWait(driver, 20).until(
+            EC.element_to_be_clickable((By.XPATH, "//a[@href='#module_hrm']//span[contains(text(),'Personal Externo')]"))
+        ).click()
+        logger.info("Clic en 'Personal Externo' realizado.")
+
+        logger.info("Intentando hacer clic en 'Estado de solicitudes Personal Externo'...")
+        WebDriverWait(driver, 20).until(
+            EC.element_to_be_clickable((By.XPATH, "//a[@href='/workflow/externalizacion-personal' and contains(text(),'Estado de solicitudes Personal Externo')]"))
+        ).click()
+        logger.info("Clic en 'Estado de solicitudes Personal Externo' realizado.")
+
+        # Esperar a que DataTables termine de dibujar la tabla
+        esperar_tabla_dibujada(driver)
+
+    except Exception as e:
+        logger.error(f"Error navegando el menú: {e}")
+        raise
+
+@medir_fase("navegacion")
+def abrir_pestana_listado(driver, tab_id):
+    """
+    Hace clic en una pestaña del listado (por ejemplo 'En Proceso') y espera a que su tabla quede dibujada.
+
+    :param driver: Instancia de Selenium WebDriver posicionada en el listado.
+    :param tab_id: Id del enlace de la pestaña.
+    """
+    try:
+        logger.info(f"Intentando hacer clic en la pestaña '{tab_id}'...")
+        WebDriverWait(driver, 20).until(
+            EC.element_to_be_clickable((By.ID, tab_id))
+        ).click()
+        logger.info(f"Clic en la pestaña '{tab_id}' realizado.")
+        esperar_tabla_dibujada(driver)
+    except Exception as e:
+        logger.error(f"Error abriendo la pestaña '{tab_id}': {e}")
+        raise
+
+@medir_fase("expandir")
+def localizar_y_clickeador_datos_solicitud(driver, timeout=30):
+    try:
+        xpath = "//div[@data-metakey='datos_solicitud']//div[@role='button' and contains(@class, 'collapseHeader')]"
+        datos_solicitud_button = WebDriverWait(driver, timeout).until(
+            EC.element_to_be_clickable((By.XPATH, xpath))
+        )
+        # Desplazamiento instantáneo: el botón queda estable sin esperar una animación
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'instant'});", datos_solicitud_button)
+
+        # Intentar con ActionChains y fallback con JavaScript
+        try:
+            ActionChains(driver).move_to_element(datos_solicitud_button).click().perform()
+            logger.info("Clic realizado usando ActionChains.")
+        except Exception as e:
+            logger.warning(f"ActionChains falló: {e}. Intentando con JavaScript.")
+            driver.execute_script("arguments[0].click();", datos_solicitud_button)
+            logger.info("Clic realizado usando JavaScript.")
+
+        # Confirmar que el botón se expandió y que el colapso terminó de abrirse
+        esperar(driver, lambda d: datos_solicitud_button.get_attribute("aria-expanded") == "true")
+        esperar_colapso_renderizado(driver, "datos_solicitud")
+        logger.info("Botón 'Datos de la solicitud' expandido correctamente.")
+        return True
+    except Exception as e:
+        logger.error(f"No se pudo localizar o hacer clic en 'Datos de la solicitud': {e}")
+        return False
+
+@medir_fase("secciones")
+def detectar_secciones(driver):
+    """
+    Detecta la presencia de secciones clave y devuelve un diccionario con True/False.
+    """
+    secciones = {
+        "boton_aceptar": False,
+        "datos_solicitud": False,
+        "aceptacion_evaluador_rrhh": False,
+        "proveedor_seleccionado": False,
+        "aceptacion_proveedor": False,
+        "cierre_automatico": False,
+        "rechazos_proveedores": False,
+        "reasignacion_solicitudes": False
+    }
+
+    try:
+        # Verificar cada sección usando sus selectores
+        if driver.find_elements(By.CSS_SELECTOR, "button.btn-outline-success[data-target='#form-modal-aceptarSolicitudYOT-aceptacion_ot']"):
+            secciones["boton_aceptar"] = True
+
+        if driver.find_elements(By.XPATH, "//div[@data-metakey='datos_solicitud']"):
+            secciones["datos_solicitud"] = True
+
+        if driver.find_elements(By.XPATH, "//div[@data-metakey='aceptacion_evaluador_rrhh']"):
+            secciones["aceptacion_evaluador_rrhh"] = True
+
+        if driver.find_elements(By.XPATH, "//div[@data-metakey='proveedor_seleccionado']"):
+            secciones["proveedor_seleccionado"] = True
+
+        if driver.find_elements(By.XPATH, "//div[@data-metakey='confirmacion_personal_a_enviar']"):
+            secciones["aceptacion_proveedor"] = True
+
+        if driver.find_elements(By.XPATH, "//div[@data-metakey='cierre_automatico']"):
+            secciones["cierre_automatico"] = True
+
+        if driver.find_elements(By.XPATH, "//div[@data-metakey='rechazo_proveedor']"):
+            secciones["rechazos_proveedores"] = True
+
+        if driver.find_elements(By.XPATH, "//div[@data-metakey='anulacion_ot']"):
+            secciones["reasignacion_solicitudes"] = True
+
+    except Exception as e:
+        logger.error(f"Error detectando secciones: {e}")
+
+    logger.info(f"Secciones detectadas: {secciones}")
+    return secciones
+
+def capturar_pantalla(driver, nombre_archivo):
+    """
+    Guarda la captura de pantalla y el HTML de la página actual en CAPTURAS_DIR.
+    La escritura se hace en segundo plano (ver capturas.CapturasFallo).
+    """
+    try:
+        if capturas.capturar(driver, nombre_archivo):
+            logger.info(f"Captura de pantalla en cola: {nombre_archivo}")
+    except Exception as e:
+        logger.error(f"No se pudo guardar la captura de pantalla {nombre_archivo}: {e}")
+
+def extraer_tabla_aceptacion_proveedor(driver):
+    try:
+        logger.info("Verificando la tabla dentro de 'Aceptación del proveedor'.")
+
+        # Esperar la tabla y leerla completa (encabezados y celdas) en la misma llamada al navegador;
+        # el timeout se aprende de las solicitudes anteriores, con un mínimo holgado y un reintento
+        # con el timeout completo si la tabla tarda más de lo habitual
+        inicio = time.perf_counter()
+        timeout = max(TIMEOUT_TABLA_PROVEEDOR_MINIMO, tiempos.timeout("tabla_proveedor", TIMEOUT_TABLA_PROVEEDOR))
+        try:
+            resultado = esperar(driver, lambda d: d.execute_script(JS_TABLA_PROVEEDOR), timeout)
+        except TimeoutException:
+            if timeout >= TIMEOUT_TABLA_PROVEEDOR:
+                raise
+            logger.warning(
+                f"La tabla de 'Aceptación del proveedor' no apareció en {timeout:.1f}s. "
+                f"Reintentando con {TIMEOUT_TABLA_PROVEEDOR:.0f}s."
+            )
+            metricas.registrar_reintento("tabla_proveedor")
+            resultado = esperar(driver, lambda d: d.execute_script(JS_TABLA_PROVEEDOR), TIMEOUT_TABLA_PROVEEDOR)
+        tiempos.observar("tabla_proveedor", time.perf_counter() - inicio)
+
+        datos_tabla = ordenar_columnas_tabla(resultado.get("encabezados") or [], resultado.get("filas") or [])
+        logger.info(f"Tabla de 'Aceptación del proveedor' extraída: {len(datos_tabla)} filas.")
+        logger.debug(f"Datos extraídos de la tabla: {datos_tabla}")
+        return datos_tabla
+
+    except TimeoutException:
+        logger.error("Timeout al esperar la tabla de 'Aceptación del proveedor'. Verifica el XPath y el tiempo de carga.")
+        return None
+    except Exception as e:
+        logger.error(f"Error al extraer la tabla de 'Aceptación del proveedor': {e}")
+        return None
+
+def iterar_todas_las_solicitudes(driver, boton_siguiente_id, extractores=None, completadas=None):
+    """
+    Extrae los datos de todas las solicitudes disponibles en la tabla, manejando la paginación,
+    y entrega cada solicitud apenas se extrae.
+
+    :param driver: Instancia de Selenium WebDriver posicionada en la tabla.
+    :param boton_siguiente_id: Id del botón 'Siguiente' de la tabla (por ejemplo 'table-dt_review_next').
+    :param extractores: Extractores adicionales para ingresar_y_extraer_datos.
+    :param completadas: Solicitudes ya extraídas (numero_solicitud -> (datos, secciones)) que se
+                        entregan sin volver a abrirlas, por ejemplo al reanudar una ejecución.
+                        Las vigentes en el caché de detalle tampoco se abren.
+    :return: Generador de tuplas (datos, secciones) en el orden de la tabla.
+    """
+    try:
+        logger.info("Iniciando extracción de solicitudes con paginación...")
+        total = 0
+        pagina_actual = 1  # Comenzamos con la página 1
+        # Pestaña del listado, a la que se vuelve si falla una solicitud (incluso antes de abrir su pestaña)
+        original_window = driver.current_window_handle
+
+        while True:
+            logger.info(f"Procesando página {pagina_actual}...")
+            inicio_pagina = time.perf_counter()
+
+            # Verificar que la tabla esté cargada y obtener las filas
+            try:
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_all_elements_located(
+                        (By.CSS_SELECTOR, "td.sorting_1 a.btn.btn-sm.text-orange")
+                    )
+                )
+                filas_solicitudes = driver.find_elements(
+                    By.CSS_SELECTOR, "td.sorting_1 a.btn.btn-sm.text-orange"
+                )
+                if not filas_solicitudes:
+                    logger.warning(f"No se encontraron solicitudes en la página {pagina_actual}. Terminando.")
+                    break
+            except TimeoutException:
+                logger.warning(f"No se encontraron solicitudes en la página {pagina_actual}. Terminando.")
+                break
+
+            logger.info(f"Se encontraron {len(filas_solicitudes)} solicitudes en la página {pagina_actual}.")
+
+            # Iterar sobre cada fila y extraer los datos
+            for solicitud_element in filas_solicitudes:
+                try:
+                    numero_solicitud = solicitud_element.text.strip()
+                    if not numero_solicitud:
+                        logger.warning("Número de solicitud vacío. Continuando con la siguiente fila.")
+                        continue
+
+                    logger.info(f"Número de solicitud leído: {numero_solicitud}")
+
+                    if completadas and numero_solicitud in completadas:
+                        logger.info(f"Solicitud {numero_solicitud} ya extraída en el punto de control. Se omite.")
+                        total += 1
+                        yield completadas[numero_solicitud]
+                        continue
+
+                    # Las solicitudes cuyo detalle ya no cambia se toman del caché sin abrirlas
+                    en_cache = cache_detalle.consultar([numero_solicitud], {numero_solicitud: extractores})
+                    if en_cache:
+                        total += 1
+                        yield en_cache[numero_solicitud]
+                        continue
+
+                    with metricas.solicitud(numero_solicitud):
+                        with presupuesto.fase("abrir"):
+                            # Hacer clic en el número de solicitud que abre una nueva pestaña
+                            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", solicitud_element)
+                            driver.execute_script("arguments[0].click();", solicitud_element)
+                            logger.info("Clic en el número de la solicitud realizado.")
+
+                            # Esperar la nueva pestaña
+                            esperar(driver, EC.number_of_windows_to_be(2))
+                            ventanas = driver.window_handles
+                            nueva_pestana = [w for w in ventanas if w != original_window][0]
+                            driver.switch_to.window(nueva_pestana)
+                            logger.info(f"Cambio de foco a la nueva pestaña: {nueva_pestana}")
+
+                        # Extraer los datos de la solicitud
+                        datos, secciones = ingresar_y_extraer_datos(driver, numero_solicitud, extractores=extractores)
+                        metricas.anotar_resultado(datos, secciones, motor="clic", pagina=pagina_actual)
+                    if datos and secciones:
+                        total += 1
+                        logger.info(f"Solicitud {numero_solicitud} extraída.")
+                        cache_detalle.guardar(datos, secciones)
+                        yield datos, secciones
+                    else:
+                        logger.warning(f"Datos incompletos para la solicitud: {numero_solicitud}")
+
+                except Exception as e:
+                    logger.error(f"Error procesando solicitud {numero_solicitud}: {e}")
+                    capturar_pantalla(driver, f"error_procesando_solicitud_{numero_solicitud}.png")
+                    # Cerrar todas las ventanas excepto la original
+                    ventanas = driver.window_handles
+                    for ventana in ventanas:
+                        if ventana != original_window:
+                            driver.switch_to.window(ventana)
+                            driver.close()
+                    driver.switch_to.window(original_window)
+                    continue
+
+            # Intentar pasar a la siguiente página
+            try:
+                current_page = driver.find_element(
+                    By.CSS_SELECTOR, "li.paginate_button.page-item.active > a"
+                ).text.strip()
+                try:
+                    next_button = driver.find_element(By.ID, boton_siguiente_id)
+                except NoSuchElementException:
+                    logger.debug("No se encontró el botón por ID. Probando selector alternativo (.next:not(.disabled))...")
+                    next_buttons = driver.find_elements(
+                        By.CSS_SELECTOR, "li.paginate_button.next:not(.disabled)"
+                    )
+                    if not next_buttons:
+                        logger.info("No hay botón 'Siguiente' habilitado. Fin de paginación.")
+                        break
+                    next_button = next_buttons[0]
+
+                # Verificar si el botón está deshabilitado
+                if "disabled" in next_button.get_attribute("class"):
+                    logger.info("Botón 'Siguiente' deshabilitado. No hay más páginas.")
+                    break
+
+                # Hacer clic en el botón "Siguiente"
+                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
+                driver.execute_script("arguments[0].click();", next_button)
+                logger.info("Clic en 'Siguiente' realizado. Esperando cambio de página.")
+
+                # Esperar hasta que la tabla cambie y DataTables termine de redibujarla
+                esperar_cambio_pagina(driver, current_page)
+                metricas.registrar("paginas", f"pagina {pagina_actual}", time.perf_counter() - inicio_pagina)
+                pagina_actual += 1
+
+            except TimeoutException:
+                logger.warning("No se detectó cambio de página después de hacer clic en 'Siguiente'. Terminando.")
+                break
+            except NoSuchElementException:
+                logger.warning("No se encontró el botón 'Siguiente'. Terminando.")
+                break
+
+        logger.info(f"Extracción completa. Total de solicitudes: {total}.")
+
+    except Exception as e:
+        logger.error(f"Error durante la extracción de todas las solicitudes: {e}")
+        capturar_pantalla(driver, "error_extraer_todas_solicitudes.png")
+
+
+@medir_fase("detalle")
+def ingresar_y_extraer_datos(driver, numero_solicitud, cerrar_pestana=True, extractores=None):
+    """
+    Extrae los datos de una solicitud específica.
+
+    :param driver: Instancia de Selenium WebDriver.
+    :param numero_solicitud: Número de la solicitud a extraer.
+    :param cerrar_pestana: Si es True, cierra la pestaña del detalle y vuelve a la original al terminar.
+    :param extractores: Diccionario clave -> (sección requerida, función(driver)) con datos adicionales;
+                        cada resultado se guarda en datos[clave] (None si la sección no está).
+    :return: Tuple (datos, secciones) o (None, None) en caso de fallo.
+    """
+    try:
+        logger.info(f"Intentando extraer datos para la solicitud: {numero_solicitud}")
+
+        # Verificar y hacer clic en 'Datos de la solicitud'
+        datos_clickeados = localizar_y_clickeador_datos_solicitud(driver)
+        if not datos_clickeados:
+            logger.warning(f"No se pudo hacer clic en 'Datos de la solicitud' para la solicitud: {numero_solicitud}")
+            capturar_pantalla(driver, f"sin_datos_solicitud_{numero_solicitud}.png")
+            return None, None
+
+        # Extraer campos y secciones en una sola llamada al navegador; campo por campo si falla
+        try:
+            with presupuesto.fase("campos"):
+                campos, secciones = extraer_datos_en_lote(driver)
+            logger.info(f"Secciones detectadas: {secciones}")
+        except Exception as e:
+            logger.warning(f"Extracción en lote fallida para la solicitud {numero_solicitud}: {e}. Extrayendo campo por campo.")
+            metricas.registrar_reintento("campos")
+            # Con el colapso ya renderizado, las etiquetas ausentes toman el valor por defecto sin esperar
+            presentes = esperar_colapso_renderizado(driver, "datos_solicitud")
+            campos = {}
+            for clave, etiqueta in ETIQUETAS_DATOS.items():
+                if not any(etiqueta in texto for texto in presentes):
+                    logger.info(f"La solicitud {numero_solicitud} no tiene '{etiqueta}'.")
+                    campos[clave] = "N/A"
+                    continue
+                with presupuesto.fase(f"campo_{clave}"):
+                    campos[clave] = extraer_texto_con_reintentos(
+                        driver, XPATH_CAMPO_DATOS.format(etiqueta), opcional=clave in CAMPOS_OPCIONALES
+                    )
+            secciones = detectar_secciones(driver)
+
+        cargo = campos["cargo"]
+        sucursal = campos["sucursal"]
+        fecha_inicio = campos["fecha_inicio"]
+        fecha_termino = campos["fecha_termino"]
+        causal = campos["causal"]
+        observaciones = campos["observaciones"]
+
+        # Generar enlace para la solicitud
+        link = URL_DETALLE_SOLICITUD.format(numero_solicitud)
+
+        # Extraer los datos adicionales del objetivo (por ejemplo, la tabla de 'Aceptación del proveedor')
+        adicionales = {}
+        for clave, (seccion, extractor) in (extractores or {}).items():
+            adicionales[clave] = None
+            if secciones.get(seccion, False):
+                logger.info(f"Intentando extraer '{clave}'.")
+                with presupuesto.fase(clave):
+                    adicionales[clave] = extractor(driver)
+                if not adicionales[clave]:
+                    logger.warning(f"No se encontraron datos para '{clave}' en la solicitud: {numero_solicitud}")
+
+        # Validar los datos extraídos
+        if not cargo or not sucursal or not fecha_inicio or not fecha_termino:
+            logger.warning(f"Datos incompletos extraídos para la solicitud {numero_solicitud}. Validación requerida.")
+
+        # Almacenar todos los datos en un diccionario
+        datos = {
+            "numero_solicitud": numero_solicitud,
+            "cargo": cargo,
+            "sucursal": sucursal,
+            "fecha_inicio": fecha_inicio,
+            "fecha_termino": fecha_termino,
+            "causal": causal,
+            "observaciones": observaciones,
+            "link": link,
+            **adicionales
+        }
+
+        logger.info(f"Datos extraídos: {datos}")
+        return datos, secciones  # Retorna el diccionario con los datos
+
+    except Exception as e:
+        logger.error(f"Error al extraer datos de la solicitud {numero_solicitud}: {e}")
+        capturar_pantalla(driver, f"error_extraccion_{numero_solicitud}.png")
+        return None, None
+    finally:
+        # Cerrar la pestaña de la solicitud y volver a la original
+        if cerrar_pestana:
+            try:
+                original_window = driver.window_handles[0]
+                driver.close()
+                if original_window in driver.window_handles:
+                    driver.switch_to.window(original_window)
+                    logger.info("Cerrada la pestaña de la solicitud y vuelto a la pestaña original.")
+                else:
+                    logger.error("No se pudo volver a la pestaña original.")
+            except Exception as e:
+                logger.error(f"Error al cerrar la pestaña de la solicitud: {e}")
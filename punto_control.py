@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from modelo import Solicitud
+
+logger = logging.getLogger(__name__)
+
+
+class PuntoControl:
+    """
+    Archivo JSONL donde se anota cada solicitud apenas termina de extraerse.
+
+    Si la ejecución se interrumpe (timeout, caída de Chrome, límite del runner), la siguiente puede
+    reanudarse con --resume y tomar de aquí las solicitudes ya extraídas en vez de volver a abrirlas.
+    """
+
+    def __init__(self, ruta, reanudar=False, ventana_horas=6):
+        """
+        :param ruta: Ruta del archivo JSONL.
+        :param reanudar: Si es True, se cargan las solicitudes del archivo; si no, se empieza de cero.
+        :param ventana_horas: Antigüedad máxima de las solicitudes que se reutilizan al reanudar.
+        """
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._completadas = {}
+        if reanudar:
+            self._cargar(ventana_horas)
+        elif os.path.exists(ruta):
+            os.remove(ruta)
+        self._archivo = open(ruta, "a", encoding="utf-8")
+        if self._archivo.tell() > 0 and not self._termina_en_salto():
+            # Cerrar la línea cortada por la interrupción antes de seguir anotando
+            self._archivo.write("\n")
+            self._archivo.flush()
+
+    def _termina_en_salto(self):
+        with open(self.ruta, "rb") as archivo:
+            archivo.seek(-1, os.SEEK_END)
+            return archivo.read(1) == b"\n"
+
+    def _cargar(self, ventana_horas):
+        if not os.path.exists(self.ruta):
+            logger.info("No hay punto de control previo. Se extraen todas las solicitudes.")
+            return
+        limite = time.time() - ventana_horas * 3600
+        with open(self.ruta, encoding="utf-8") as archivo:
+            for linea in archivo:
+                if not linea.strip():
+                    continue
+                try:
+                    registro = json.loads(linea)
+                    if registro["instante"] >= limite:
+                        clave = (registro["objetivo"], registro["datos"]["numero_solicitud"])
+                        self._completadas[clave] = Solicitud.desde_extraccion(registro["datos"], registro["secciones"])
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    # Línea cortada por la interrupción o incompleta: se ignora y esa solicitud se vuelve a extraer
+                    logger.warning(f"Línea del punto de control ignorada ({type(e).__name__}: {e}).")
+                    continue
+        logger.info(f"Reanudando: {len(self._completadas)} solicitudes ya extraídas en el punto de control.")
+
+    def completadas(self, objetivo):
+        """
+        Devuelve las solicitudes del objetivo ya extraídas en la ventana de reanudación.
+
+        :param objetivo: Nombre del objetivo (por ejemplo 'principal').
+        :return: Diccionario numero_solicitud -> Solicitud.
+        """
+        return {numero: solicitud for (nombre, numero), solicitud in self._completadas.items() if nombre == objetivo}
+
+    def registrar(self, objetivo, solicitud):
+        """
+        Anota una solicitud extraída y la escribe de inmediato en el disco.
+
+        :param objetivo: Nombre del objetivo al que pertenece.
+        :param solicitud: Solicitud extraída.
+        """
+        datos, secciones = solicitud.como_extraccion()
+        linea = json.dumps(
+            {"objetivo": objetivo, "instante": time.time(), "datos": datos, "secciones": secciones},
+            ensure_ascii=False
+        )
+        with self._lock:
+            self._completadas[(objetivo, solicitud.numero_solicitud)] = solicitud
+            self._archivo.write(linea + "\n")
+            self._archivo.flush()
+            os.fsync(self._archivo.fileno())
+
+    def cerrar(self, completado=False):
+        """
+        Cierra el archivo.
+
+        :param completado: Si es True (la ejecución terminó bien), se elimina el punto de control.
+        """
+        with self._lock:
+            self._archivo.close()
+        if completado and os.path.exists(self.ruta):
+            os.remove(self.ruta)
+            logger.info("Ejecución completa. Punto de control eliminado.")
@@ -0,0 +1,170 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from metricas import metricas
+
+# Nivel del archivo de log (la consola siempre muestra INFO o más)
+NIVEL_LOG = os.getenv("NIVEL_LOG", "INFO").upper()
+# Niveles por librería, "nombre=NIVEL" separados por coma. Por defecto WARNING: cada llamada HTTP de
+# WebDriver no crea ningún registro. Con DEBUG (p. ej. "selenium=DEBUG") y DEBUG muestreado, el DEBUG
+# de la librería solo llega al archivo si la solicitud en curso falla
+NIVELES_LIBRERIAS = os.getenv(
+    "NIVELES_LIBRERIAS",
+    "urllib3=WARNING,selenium=WARNING,websocket=WARNING,googleapiclient=WARNING,google=WARNING"
+)
+# Guarda en memoria el DEBUG de cada solicitud y lo escribe solo si la solicitud registra un error
+DEBUG_MUESTREADO = os.getenv("DEBUG_MUESTREADO", "1") == "1"
+# Registros DEBUG que se guardan como máximo por solicitud
+DEBUG_MAX_REGISTROS = int(os.getenv("DEBUG_MAX_REGISTROS", "500"))
+# Rotación del archivo de log de cada bot
+LOG_MAX_MB = float(os.getenv("LOG_MAX_MB", "10"))
+LOG_RESPALDOS = int(os.getenv("LOG_RESPALDOS", "5"))
+
+FORMATO = "%(asctime)s - %(levelname)s - %(message)s"
+
+_listener = None
+_manejador = None
+
+
+class ManejadorCola(QueueHandler):
+    """
+    Encola los registros para que el QueueListener los escriba en otro hilo.
+
+    Los registros por debajo del nivel del archivo no se encolan: con DEBUG muestreado se guardan por
+    hilo mientras dure la solicitud activa (ver metricas.solicitud) y se encolan todos juntos solo si
+    la solicitud registra un ERROR o termina con una excepción; si termina bien se descartan.
+    """
+
+    def __init__(self, cola, nivel, muestreo=True, max_registros=500):
+        super().__init__(cola)
+        self.nivel = nivel
+        self.muestreo = muestreo
+        self.max_registros = max_registros
+        self._local = threading.local()
+
+    def _pendientes(self, numero_solicitud):
+        if getattr(self._local, "solicitud", None) != numero_solicitud:
+            self._local.solicitud = numero_solicitud
+            self._local.registros = deque(maxlen=self.max_registros)
+        return self._local.registros
+
+    def _volcar(self, pendientes):
+        inicio = logging.makeLogRecord({
+            "name": __name__, "levelno": logging.ERROR, "levelname": "ERROR",
+            "msg": f"--- DEBUG de la solicitud {self._local.solicitud} ({len(pendientes)} registros) ---"
+        })
+        super().handle(inicio)
+        for pendiente in pendientes:
+            super().handle(pendiente)
+        pendientes.clear()
+
+    def handle(self, record):
+        if record.levelno >= self.nivel and record.levelno < logging.ERROR:
+            return super().handle(record)
+
+        numero_solicitud = metricas.solicitud_actual()
+        if record.levelno < self.nivel:
+            if self.muestreo and numero_solicitud is not None:
+                self._pendientes(numero_solicitud).append(record)
+            return False
+
+        # Los errores fuera de una solicitud no arrastran el DEBUG de ninguna
+        if numero_solicitud is not None:
+            pendientes = self._pendientes(numero_solicitud)
+            if pendientes:
+                self._volcar(pendientes)
+        return super().handle(record)
+
+    def terminar_solicitud(self, numero_solicitud, fallida):
+        """
+        Al terminar una solicitud en el hilo actual, escribe su DEBUG guardado si terminó con una
+        excepción y lo descarta en cualquier caso.
+
+        :param numero_solicitud: Número de la solicitud que terminó.
+        :param fallida: True si terminó con una excepción.
+        """
+        if getattr(self._local, "solicitud", None) != numero_solicitud:
+            return
+        pendientes = self._local.registros
+        if fallida and pendientes:
+            self._volcar(pendientes)
+        self._local.solicitud = None
+        self._local.registros = None
+
+
+def _nivel(nombre):
+    nivel = logging.getLevelName(nombre.strip().upper())
+    return nivel if isinstance(nivel, int) else logging.INFO
+
+
+def configurar_registro(nombre):
+    """
+    Configura el logging de la ejecución: archivo rotativo '<nombre>.log' (una rotación por ejecución)
+    y consola, ambos escritos desde un QueueListener en segundo plano.
+
+    :param nombre: Nombre del bot (por ejemplo 'robot', 'bot' o 'pipeline').
+    :return: Ruta del archivo de log.
+    """
+    global _listener, _manejador
+    detener_registro()
+
+    ruta = f"{nombre}.log"
+    nivel = _nivel(NIVEL_LOG)
+
+    archivo = RotatingFileHandler(
+        ruta, maxBytes=int(LOG_MAX_MB * 1024 * 1024), backupCount=LOG_RESPALDOS, encoding="utf-8", delay=True
+    )
+    if os.path.exists(ruta) and os.path.getsize(ruta) > 0:
+        # Cada ejecución empieza un archivo nuevo; las anteriores quedan como <nombre>.log.1, .2...
+        archivo.doRollover()
+    archivo.setLevel(logging.DEBUG)
+    archivo.setFormatter(logging.Formatter(FORMATO))
+
+    consola = logging.StreamHandler()
+    consola.setLevel(logging.INFO)
+    consola.setFormatter(logging.Formatter(FORMATO))
+
+    cola = queue.SimpleQueue()
+    raiz = logging.getLogger()
+    for manejador in list(raiz.handlers):
+        raiz.removeHandler(manejador)
+    _manejador = ManejadorCola(cola, nivel, DEBUG_MUESTREADO, DEBUG_MAX_REGISTROS)
+    raiz.addHandler(_manejador)
+    raiz.setLevel(logging.DEBUG if DEBUG_MUESTREADO else nivel)
+
+    for par in NIVELES_LIBRERIAS.split(","):
+        if "=" in par:
+            libreria, nivel_libreria = par.split("=", 1)
+            # Sin muestreo, el DEBUG por debajo del nivel del archivo se descarta ya en el logger
+            nivel_libreria = _nivel(nivel_libreria) if DEBUG_MUESTREADO else max(_nivel(nivel_libreria), nivel)
+            logging.getLogger(libreria.strip()).setLevel(nivel_libreria)
+
+    _listener = QueueListener(cola, archivo, consola, respect_handler_level=True)
+    _listener.start()
+    return ruta
+
+
+def detener_registro():
+    """
+    Escribe los registros pendientes de la cola y detiene el hilo de escritura.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for manejador in _listener.handlers:
+            manejador.close()
+        _listener = None
+
+
+def _terminar_solicitud(numero_solicitud, fallida):
+    if _manejador is not None:
+        _manejador.terminar_solicitud(numero_solicitud, fallida)
+
+
+metricas.al_terminar_solicitud(_terminar_solicitud)
+atexit.register(detener_registro)
@@ -0,0 +1,105 @@
+import logging
+import os
+import threading
+from collections import deque
+
+from tenacity import (
+    Retrying,
+    retry_if_exception,
+    retry_if_exception_type,
+    stop_after_attempt,
+    stop_after_delay,
+    wait_random_exponential
+)
+
+from metricas import metricas
+
+logger = logging.getLogger(__name__)
+
+# Límites del timeout aprendido por selector, en segundos
+TIMEOUT_MINIMO = float(os.getenv("TIMEOUT_MINIMO", "2"))
+TIMEOUT_MAXIMO = float(os.getenv("TIMEOUT_MAXIMO", "15"))
+# Multiplicador sobre el p95 de las latencias observadas
+TIMEOUT_FACTOR = float(os.getenv("TIMEOUT_FACTOR", "3"))
+# Tope de la espera entre reintentos (backoff exponencial con jitter), en segundos
+ESPERA_MAXIMA_REINTENTO = float(os.getenv("ESPERA_MAXIMA_REINTENTO", "30"))
+
+
+class TiemposAdaptativos:
+    """
+    Aprende un timeout por selector a partir de las latencias observadas (p95 de las últimas
+    muestras por TIMEOUT_FACTOR, acotado entre TIMEOUT_MINIMO y TIMEOUT_MAXIMO).
+
+    Mientras un selector no tiene muestras suficientes se usa el timeout inicial indicado.
+    Es seguro usarlo desde varios hilos.
+    """
+
+    def __init__(self, muestras=50, minimo_muestras=5):
+        self._lock = threading.Lock()
+        self._latencias = {}
+        self._muestras = muestras
+        self._minimo_muestras = minimo_muestras
+
+    def observar(self, clave, segundos):
+        """
+        Registra cuánto tardó en aparecer el elemento de un selector.
+
+        :param clave: Selector (o nombre) de la espera.
+        :param segundos: Latencia observada.
+        """
+        with self._lock:
+            self._latencias.setdefault(clave, deque(maxlen=self._muestras)).append(segundos)
+
+    def timeout(self, clave, inicial=TIMEOUT_MAXIMO):
+        """
+        Devuelve el timeout a usar para un selector.
+
+        :param clave: Selector (o nombre) de la espera.
+        :param inicial: Timeout mientras no haya muestras suficientes.
+        :return: Timeout en segundos.
+        """
+        with self._lock:
+            latencias = sorted(self._latencias.get(clave, ()))
+        if len(latencias) < self._minimo_muestras:
+            return inicial
+        p95 = latencias[max(0, int(len(latencias) * 0.95 + 0.5) - 1)]
+        return min(TIMEOUT_MAXIMO, max(TIMEOUT_MINIMO, p95 * TIMEOUT_FACTOR))
+
+
+tiempos = TiemposAdaptativos()
+
+
+def politica_reintentos(nombre, intentos=3, espera_inicial=1, excepciones=(Exception,), reintentar_si=None, limite=None):
+    """
+    Política de reintentos compartida: backoff exponencial con jitter, conteo en las métricas
+    y un aviso en el log antes de cada reintento. La última excepción se relanza.
+
+    :param nombre: Qué se reintenta (aparece en el log y en metricas.registrar_reintento).
+    :param intentos: Número máximo de intentos.
+    :param espera_inicial: Base del backoff en segundos (la espera crece hasta ESPERA_MAXIMA_REINTENTO).
+    :param excepciones: Tipos de excepción que se reintentan.
+    :param reintentar_si: Función opcional (excepción) -> bool para descartar errores no transitorios.
+    :param limite: Tiempo total máximo en segundos para todos los intentos (opcional).
+    :return: tenacity.Retrying; se usa como politica(funcion, *args) o iterando con 'for intento in politica'.
+    """
+    condicion = retry_if_exception_type(excepciones)
+    if reintentar_si is not None:
+        condicion = condicion & retry_if_exception(reintentar_si)
+    parada = stop_after_attempt(intentos)
+    if limite is not None:
+        parada = parada | stop_after_delay(limite)
+
+    def antes_de_esperar(estado):
+        metricas.registrar_reintento(nombre)
+        logger.warning(
+            f"Intento {estado.attempt_number} fallido de '{nombre}': {estado.outcome.exception()}. "
+            f"Reintentando en {estado.next_action.sleep:.1f}s."
+        )
+
+    return Retrying(
+        retry=condicion,
+        stop=parada,
+        wait=wait_random_exponential(multiplier=espera_inicial, max=ESPERA_MAXIMA_REINTENTO),
+        before_sleep=antes_de_esperar,
+        reraise=True
+    )
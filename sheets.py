@@ -0,0 +1,368 @@
+import logging
+import os
+import queue
+import re
+import threading
+import time
+
+from google.auth.credentials import AnonymousCredentials
+from google.oauth2.service_account import Credentials
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from metricas import metricas
+from reintentos import politica_reintentos
+
+logger = logging.getLogger(__name__)
+
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive"
+]
+RUTA_CREDENCIALES = "service_account.json"
+# Endpoint alternativo de la API de Sheets (por ejemplo, el falso de benchmark/portal_simulado.py);
+# con él se usan credenciales anónimas
+SHEETS_API_ENDPOINT = os.getenv("SHEETS_API_ENDPOINT")
+
+_lock = threading.Lock()
+_credenciales = None
+_servicios = threading.local()
+_FIN = object()
+
+
+def obtener_credenciales():
+    """
+    Devuelve las credenciales de la cuenta de servicio, leídas una sola vez por proceso.
+
+    El mismo objeto guarda el token de acceso y solo lo renueva cuando expira, así que todas las
+    llamadas a la API comparten un único intercambio OAuth.
+    """
+    global _credenciales
+    with _lock:
+        if _credenciales is None:
+            _credenciales = Credentials.from_service_account_file(RUTA_CREDENCIALES, scopes=SCOPES)
+        return _credenciales
+
+
+def obtener_servicio(nombre="sheets", version="v4"):
+    """
+    Devuelve un cliente de la API de Google construido una sola vez y reutilizado.
+
+    Usa el documento de descubrimiento estático incluido en google-api-python-client, sin pedirlo por red.
+    Los clientes se guardan por hilo porque httplib2 no es seguro entre hilos; las credenciales (y su
+    token) se comparten entre todos.
+
+    :param nombre: Nombre de la API (por ejemplo 'sheets' o 'drive').
+    :param version: Versión de la API.
+    :return: Recurso de la API listo para usar.
+    """
+    cache = getattr(_servicios, "cache", None)
+    if cache is None:
+        cache = _servicios.cache = {}
+    if (nombre, version) not in cache:
+        if nombre == "sheets" and SHEETS_API_ENDPOINT:
+            opciones = {"credentials": AnonymousCredentials(), "client_options": {"api_endpoint": SHEETS_API_ENDPOINT}}
+        else:
+            opciones = {"credentials": obtener_credenciales()}
+        cache[(nombre, version)] = build(
+            nombre, version,
+            static_discovery=True,
+            cache_discovery=False,
+            **opciones
+        )
+        logger.debug(f"Cliente de Google API '{nombre} {version}' creado.")
+    return cache[(nombre, version)]
+
+
+def _columna_a_indice(columna):
+    indice = 0
+    for letra in columna.upper():
+        indice = indice * 26 + (ord(letra) - ord("A") + 1)
+    return indice
+
+
+def _indice_a_columna(indice):
+    columna = ""
+    while indice > 0:
+        indice, resto = divmod(indice - 1, 26)
+        columna = chr(ord("A") + resto) + columna
+    return columna
+
+
+def parsear_rango(rango):
+    """
+    Separa un rango A1 del tipo 'Hoja!A3:Q' en sus partes.
+
+    :param rango: Rango en notación A1 con hoja, columna inicial, fila inicial y columna final.
+    :return: Tuple (hoja, columna_inicial, fila_inicial, columna_final).
+    """
+    hoja, celdas = rango.rsplit("!", 1)
+    coincidencia = re.fullmatch(r"([A-Za-z]+)(\d+):([A-Za-z]+)\d*", celdas)
+    if not coincidencia:
+        raise ValueError(f"Rango no soportado: {rango}")
+    return hoja, coincidencia.group(1).upper(), int(coincidencia.group(2)), coincidencia.group(3).upper()
+
+
+def _agrupar_por_clave(filas):
+    """
+    Agrupa las filas por su primera columna (numero_solicitud), en el orden de primera aparición.
+    """
+    bloques = {}
+    for fila in filas:
+        clave = fila[0] if fila else ""
+        if clave:
+            bloques.setdefault(clave, []).append(fila)
+    return bloques
+
+
+def _normalizar_fila(fila, ancho):
+    valores = ["" if valor is None else str(valor) for valor in fila[:ancho]]
+    return valores + [""] * (ancho - len(valores))
+
+
+def calcular_cambios(actuales, deseadas, ancho, eliminar=True):
+    """
+    Calcula qué filas de la hoja hay que reescribir para que contenga exactamente las filas deseadas.
+
+    En la sincronización completa (eliminar=True) la hoja queda en el orden de deseadas (el del
+    listado): las solicitudes que cambiaron de posición se mueven y las que ya no existen se eliminan
+    desplazando las siguientes hacia arriba. En la actualización parcial (eliminar=False) las
+    solicitudes que ya están conservan su posición y las nuevas se agregan al final; la siguiente
+    sincronización completa las deja en su lugar.
+    Solo se devuelven los tramos de filas cuyo contenido cambia; por el desplazamiento, insertar o
+    eliminar una solicitud cerca del principio reescribe todas las filas que están debajo de ella.
+
+    :param actuales: Filas leídas de la hoja (la primera columna es numero_solicitud).
+    :param deseadas: Filas que deben quedar en la hoja.
+    :param ancho: Número de columnas a comparar y escribir.
+    :param eliminar: Si es False, las solicitudes de la hoja que no están en deseadas se conservan
+                     (actualización parcial).
+    :return: Tuple (tramos, resumen); tramos es una lista de (desplazamiento, filas) y resumen
+             un diccionario con el número de solicitudes insertadas, actualizadas y eliminadas.
+    """
+    bloques_actuales = _agrupar_por_clave(actuales)
+    bloques_deseados = _agrupar_por_clave(deseadas)
+    if not eliminar:
+        bloques_deseados = {**bloques_actuales, **bloques_deseados}
+
+    final = []
+    if eliminar:
+        for bloque in bloques_deseados.values():
+            final.extend(bloque)
+    else:
+        for clave in bloques_actuales:
+            final.extend(bloques_deseados.get(clave, []))
+        for clave, bloque in bloques_deseados.items():
+            if clave not in bloques_actuales:
+                final.extend(bloque)
+
+    actuales = [_normalizar_fila(fila, ancho) for fila in actuales]
+    final = [_normalizar_fila(fila, ancho) for fila in final]
+    vacia = [""] * ancho
+
+    tramos = []
+    for indice in range(max(len(actuales), len(final))):
+        fila_actual = actuales[indice] if indice < len(actuales) else vacia
+        fila_final = final[indice] if indice < len(final) else vacia
+        if fila_actual == fila_final:
+            continue
+        if tramos and tramos[-1][0] + len(tramos[-1][1]) == indice:
+            tramos[-1][1].append(fila_final)
+        else:
+            tramos.append((indice, [fila_final]))
+
+    resumen = {
+        "insertadas": sum(1 for clave in bloques_deseados if clave not in bloques_actuales),
+        "actualizadas": sum(
+            1 for clave, bloque in bloques_deseados.items()
+            if clave in bloques_actuales and
+            [_normalizar_fila(f, ancho) for f in bloque] != [_normalizar_fila(f, ancho) for f in bloques_actuales[clave]]
+        ),
+        "eliminadas": sum(1 for clave in bloques_actuales if clave not in bloques_deseados),
+    }
+    return tramos, resumen
+
+
+def _preparar_rango(rango, filas):
+    hoja, columna_inicial, fila_inicial, columna_final = parsear_rango(rango)
+    indice_inicial = _columna_a_indice(columna_inicial)
+    ancho = max(
+        _columna_a_indice(columna_final) - indice_inicial + 1,
+        max((len(fila) for fila in filas), default=0)
+    )
+    columna_lectura = _indice_a_columna(indice_inicial + ancho - 1)
+    return hoja, columna_inicial, fila_inicial, columna_lectura, ancho
+
+
+def es_error_transitorio(error):
+    """
+    Indica si vale la pena reintentar un error de la API de Google: cuota excedida (429), errores
+    del servidor (5xx) o de red. Los errores de la solicitud (400, 403, 404...) fallan de inmediato.
+
+    :param error: Excepción lanzada por la llamada.
+    :return: True si el error es transitorio.
+    """
+    if isinstance(error, HttpError):
+        return error.resp.status == 429 or error.resp.status >= 500
+    return True
+
+
+def escribir_diferencias_lote(service, spreadsheet_id, filas_por_rango, intentos=3, delay=5, eliminar=True):
+    """
+    Sincroniza varias hojas a la vez: las lee con un único values().batchGet y aplica solo las filas
+    insertadas, actualizadas o eliminadas de todas ellas en un único values().batchUpdate, sin dejar
+    ninguna hoja vacía en ningún momento.
+
+    :param service: Servicio de Google Sheets v4.
+    :param spreadsheet_id: ID de la hoja de cálculo.
+    :param filas_por_rango: Diccionario rango -> filas deseadas (por ejemplo {'Principal!A3:Q': [...]});
+                            la primera columna de cada fila es numero_solicitud.
+    :param intentos: Número máximo de intentos ante errores transitorios.
+    :param delay: Base del backoff exponencial entre intentos en segundos.
+    :param eliminar: Si es False, solo se insertan o actualizan las solicitudes indicadas y se
+                     conservan las demás filas de cada hoja.
+    :return: Número de filas escritas.
+    """
+    if not filas_por_rango:
+        return 0
+
+    rangos = {rango: _preparar_rango(rango, filas) for rango, filas in filas_por_rango.items()}
+    rangos_lectura = [
+        f"{hoja}!{columna_inicial}{fila_inicial}:{columna_lectura}"
+        for hoja, columna_inicial, fila_inicial, columna_lectura, _ in rangos.values()
+    ]
+
+    def aplicar():
+        try:
+            with metricas.medir("sheets", "batchGet") as detalle:
+                detalle["rangos"] = len(rangos_lectura)
+                respuesta = service.spreadsheets().values().batchGet(
+                    spreadsheetId=spreadsheet_id,
+                    ranges=rangos_lectura,
+                    valueRenderOption="FORMATTED_VALUE"
+                ).execute()
+            lecturas = respuesta.get("valueRanges", [])
+
+            data = []
+            for (rango, filas), lectura in zip(filas_por_rango.items(), lecturas):
+                hoja, columna_inicial, fila_inicial, columna_lectura, ancho = rangos[rango]
+                tramos, resumen = calcular_cambios(lectura.get("values", []), filas, ancho, eliminar)
+                logger.info(
+                    f"Diferencias en '{hoja}': {resumen['insertadas']} insertadas, {resumen['actualizadas']} "
+                    f"actualizadas, {resumen['eliminadas']} eliminadas; {sum(len(t[1]) for t in tramos)} filas a escribir."
+                )
+                data.extend(
+                    {
+                        "range": f"{hoja}!{columna_inicial}{fila_inicial + desplazamiento}:"
+                                 f"{columna_lectura}{fila_inicial + desplazamiento + len(valores) - 1}",
+                        "values": valores
+                    }
+                    for desplazamiento, valores in tramos
+                )
+            if not data:
+                return 0
+
+            with metricas.medir("sheets", "batchUpdate") as detalle:
+                result = service.spreadsheets().values().batchUpdate(
+                    spreadsheetId=spreadsheet_id,
+                    # RAW: la hoja guarda el texto tal cual, así lo que se lee en la próxima ejecución
+                    # es idéntico a lo escrito (USER_ENTERED reformatea fechas y números y cada
+                    # ejecución los vería como cambiados)
+                    body={"valueInputOption": "RAW", "data": data}
+                ).execute()
+                detalle.update(filas=result.get("totalUpdatedRows", 0), tramos=len(data))
+
+            filas_escritas = result.get("totalUpdatedRows", 0)
+            logger.info(f"Se actualizaron {filas_escritas} filas en {len(filas_por_rango)} hojas en {len(data)} tramos.")
+            return filas_escritas
+
+        except Exception as e:
+            logger.error(f"Error aplicando diferencias en Google Sheets: {e}")
+            raise
+
+    return politica_reintentos("sheets", intentos, delay, reintentar_si=es_error_transitorio)(aplicar)
+
+
+class SubidorSheets:
+    """
+    Sube a Google Sheets en segundo plano las filas que se van extrayendo, en tandas de
+    max_filas filas o cada max_segundos segundos, mientras la extracción continúa.
+
+    Las tandas solo insertan o actualizan solicitudes (no eliminan filas); la sincronización
+    completa de la hoja se hace al final con escribir_diferencias_lote.
+    """
+
+    def __init__(self, spreadsheet_id, max_filas=50, max_segundos=30):
+        """
+        :param spreadsheet_id: ID de la hoja de cálculo.
+        :param max_filas: Filas acumuladas que provocan una subida.
+        :param max_segundos: Tiempo máximo que una fila espera antes de subirse.
+        """
+        self.spreadsheet_id = spreadsheet_id
+        self.max_filas = max_filas
+        self.max_segundos = max_segundos
+        self.filas_subidas = 0
+        self._cola = queue.Queue()
+        self._hilo = threading.Thread(target=self._ejecutar, name="subidor-sheets", daemon=True)
+        self._hilo.start()
+
+    def agregar(self, rango, filas):
+        """
+        Encola las filas de una solicitud para subirlas en la próxima tanda.
+
+        :param rango: Rango de la hoja (por ejemplo 'Principal!A3:Q').
+        :param filas: Filas de una misma solicitud (la primera columna es numero_solicitud).
+        """
+        if filas:
+            self._cola.put((rango, filas))
+
+    def cerrar(self, vaciar=True):
+        """
+        Detiene el hilo de subida.
+
+        :param vaciar: Si es True, sube antes las filas pendientes; si es False, se descartan
+                       (por ejemplo, porque a continuación se sincroniza la hoja completa).
+        """
+        self._cola.put((_FIN, vaciar))
+        self._hilo.join()
+
+    def _ejecutar(self):
+        pendientes = {}
+        cantidad = 0
+        limite = None
+        while True:
+            espera = None if limite is None else max(0.0, limite - time.monotonic())
+            try:
+                rango, filas = self._cola.get(timeout=espera)
+            except queue.Empty:
+                rango = None
+
+            if rango is _FIN:
+                if filas and pendientes:
+                    self._subir(pendientes)
+                return
+            if rango is not None:
+                pendientes.setdefault(rango, {})[filas[0][0]] = filas
+                cantidad += len(filas)
+                if limite is None:
+                    limite = time.monotonic() + self.max_segundos
+
+            if pendientes and (cantidad >= self.max_filas or time.monotonic() >= limite):
+                self._subir(pendientes)
+                pendientes = {}
+                cantidad = 0
+                limite = None
+
+    def _subir(self, pendientes):
+        filas_por_rango = {
+            rango: [fila for bloque in bloques.values() for fila in bloque]
+            for rango, bloques in pendientes.items()
+        }
+        try:
+            self.filas_subidas += escribir_diferencias_lote(
+                obtener_servicio("sheets", "v4"), self.spreadsheet_id, filas_por_rango,
+                intentos=1, eliminar=False
+            )
+        except Exception as e:
+            # La sincronización final vuelve a escribir estas filas
+            logger.error(f"Error subiendo una tanda parcial a Google Sheets: {e}")
@@ -1,13 +1,8 @@
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
+from sheets import obtener_servicio
 
 def test_drive_connection():
     try:
-        creds = Credentials.from_service_account_file(
-            "service_account.json",
-            scopes=["https://www.googleapis.com/auth/drive"]
-        )
-        drive_service = build("drive", "v3", credentials=creds)
+        drive_service = obtener_servicio("drive", "v3")
         print("Conexión con Google Drive establecida con éxito.")
 
         results = drive_service.files().list(